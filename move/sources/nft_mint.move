@@ -20,6 +20,11 @@ module sui_chat_wallet::nft_mint {
         name: String,
     }
 
+    /// Batch argument vectors have different lengths
+    const ELengthMismatch: u64 = 0;
+    /// Batch contains no items
+    const EEmptyBatch: u64 = 1;
+
     /// Initialize the module
     fun init(_ctx: &TxContext) {
         // No initialization needed
@@ -60,6 +65,37 @@ module sui_chat_wallet::nft_mint {
         transfer::public_transfer(nft, sender);
     }
 
+    /// Mint several NFTs in one transaction; item i uses names[i], descriptions[i], image_urls[i]
+    public fun mint_batch_to_sender(
+        mut names: vector<vector<u8>>,
+        mut descriptions: vector<vector<u8>>,
+        mut image_urls: vector<vector<u8>>,
+        ctx: &mut TxContext
+    ) {
+        let count = vector::length(&names);
+        assert!(count > 0, EEmptyBatch);
+        assert!(vector::length(&descriptions) == count, ELengthMismatch);
+        assert!(vector::length(&image_urls) == count, ELengthMismatch);
+
+        // Reverse so pop_back mints in the order the items were given
+        vector::reverse(&mut names);
+        vector::reverse(&mut descriptions);
+        vector::reverse(&mut image_urls);
+
+        while (!vector::is_empty(&names)) {
+            mint_to_sender(
+                vector::pop_back(&mut names),
+                vector::pop_back(&mut descriptions),
+                vector::pop_back(&mut image_urls),
+                ctx
+            );
+        };
+
+        vector::destroy_empty(names);
+        vector::destroy_empty(descriptions);
+        vector::destroy_empty(image_urls);
+    }
+
     /// Get NFT name
     public fun name(nft: &NFT): &String {
         &nft.name
@@ -0,0 +1,134 @@
+"""
+Batch NFT minting pipeline.
+
+Fans image generation and upload for N items out over a bounded worker pool,
+streams progress as NDJSON and finishes with a single transaction payload for
+`nft_mint::mint_batch_to_sender`, so the whole drop is one wallet signature.
+
+Upstream calls made from the workers use their per-upstream timeouts and
+circuit breakers (there is no request deadline for a long-running batch).
+"""
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel, Field
+
+from indexer.sources import nft_package_id
+
+MAX_ITEMS = int(os.getenv("BATCH_MINT_MAX_ITEMS", "50"))
+CONCURRENCY = int(os.getenv("BATCH_MINT_CONCURRENCY", "4"))
+
+
+class BatchMintItem(BaseModel):
+    name: str
+    description: str
+    image_url: Optional[str] = None  # already hosted; skips generation and upload
+
+
+class BatchMintRequest(BaseModel):
+    items: List[BatchMintItem] = Field(..., min_length=1, max_length=MAX_ITEMS)
+    wallet_address: Optional[str] = None
+
+
+def mint_package_id() -> str:
+    """Package id to call; differs from the original id after a package upgrade"""
+    return os.getenv("NFT_MINT_PACKAGE_ID") or nft_package_id()
+
+
+def build_transaction(items: List[Dict]) -> Dict:
+    """Move call payload for the frontend to sign (items in input order)"""
+    return {
+        "kind": "moveCall",
+        "target": f"{mint_package_id()}::nft_mint::mint_batch_to_sender",
+        "arguments": {
+            "names": [item["name"] for item in items],
+            "descriptions": [item["description"] for item in items],
+            "image_urls": [item["image_url"] for item in items],
+        },
+        "count": len(items),
+    }
+
+
+def _event(payload: Dict) -> bytes:
+    return (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _process_item(index: int, item: BatchMintItem, generate_image: Callable[[str], Dict],
+                  upload_image: Callable[[str], Dict], progress: "queue.Queue",
+                  stop: threading.Event) -> Dict:
+    if item.image_url:
+        return {"index": index, "name": item.name, "description": item.description, "image_url": item.image_url}
+
+    generated = generate_image(item.description)
+    if not generated.get("success"):
+        raise RuntimeError(generated.get("error", "Image generation failed"))
+    progress.put({"type": "progress", "index": index, "stage": "image_generated"})
+    if stop.is_set():
+        raise RuntimeError("Batch cancelled")
+
+    uploaded = upload_image(generated["image_base64"])
+    if not uploaded.get("success"):
+        raise RuntimeError(uploaded.get("error", "Image upload failed"))
+    progress.put({"type": "progress", "index": index, "stage": "uploaded"})
+
+    return {"index": index, "name": item.name, "description": item.description, "image_url": uploaded["image_url"]}
+
+
+def run_batch(request: BatchMintRequest, generate_image: Callable[[str], Dict],
+              upload_image: Callable[[str], Dict]) -> Iterator[bytes]:
+    """Yield NDJSON progress events, ending with a `complete` event"""
+    total = len(request.items)
+    progress: "queue.Queue" = queue.Queue()
+    results: Dict[int, Dict] = {}
+    failed: List[Dict] = []
+    stop = threading.Event()
+    yield _event({"type": "started", "total": total, "concurrency": CONCURRENCY})
+
+    def worker(index: int, item: BatchMintItem):
+        try:
+            result = _process_item(index, item, generate_image, upload_image, progress, stop)
+            progress.put({"type": "item_done", "index": index, "result": result})
+        except Exception as e:
+            progress.put({"type": "item_failed", "index": index, "error": str(e)})
+
+    executor = ThreadPoolExecutor(max_workers=min(CONCURRENCY, total), thread_name_prefix="batch-mint")
+    try:
+        for index, item in enumerate(request.items):
+            executor.submit(worker, index, item)
+
+        finished = 0
+        while finished < total:
+            message = progress.get()
+            if message["type"] == "item_done":
+                finished += 1
+                results[message["index"]] = message["result"]
+                yield _event({"type": "progress", "index": message["index"], "stage": "ready",
+                              "image_url": message["result"]["image_url"],
+                              "completed": finished, "total": total})
+            elif message["type"] == "item_failed":
+                finished += 1
+                failed.append({"index": message["index"], "name": request.items[message["index"]].name,
+                               "error": message["error"]})
+                print(f"❌ Batch mint item {message['index']} failed: {message['error']}")
+                yield _event({"type": "progress", "index": message["index"], "stage": "failed",
+                              "error": message["error"], "completed": finished, "total": total})
+            else:
+                yield _event(message)
+    finally:
+        # If the client disconnected the generator is closed early: drop items
+        # that have not started and skip uploads for the ones still running
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    ready = [results[index] for index in sorted(results)]
+    yield _event({
+        "type": "complete",
+        "success": bool(ready),
+        "minted_count": len(ready),
+        "failed": failed,
+        "transaction": build_transaction(ready) if ready else None,
+    })
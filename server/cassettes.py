@@ -0,0 +1,173 @@
+"""
+Record/replay cassettes for upstream LLM and image calls.
+
+While a cassette is active (`use_cassette(...)`, or CASSETTE_MODE/CASSETTE_PATH
+in the environment), `graphs.base.build_openai_client()` and
+`graphs.base.generate_nft_image()` go through it:
+
+- record: the real upstream is called and each request/response pair is
+  appended to the cassette together with its wall-clock latency.
+- replay: responses are served from the cassette without network access and
+  without sleeping, so graph runs are fast and deterministic. The recorded
+  latency is still reported as virtual upstream time.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+CASSETTE_VERSION = 1
+
+_active = None
+_active_lock = threading.Lock()
+
+
+class CassetteMiss(RuntimeError):
+    """Replay found no recorded interaction for a request"""
+
+
+def request_key(kind: str, request: Dict) -> str:
+    payload = json.dumps({"kind": kind, "request": request}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class Cassette:
+    """Recorded upstream interactions plus the conversation that produced them"""
+
+    def __init__(self, path, mode: str):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.interactions: List[Dict] = []
+        self.conversation: Dict = {}
+        self.mismatches: List[Dict] = []
+        self.virtual_upstream_ms = 0.0
+        self._used = set()
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self.load()
+
+    def load(self):
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version: {data.get('version')}")
+        self.interactions = data.get("interactions", [])
+        self.conversation = data.get("conversation", {})
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": CASSETTE_VERSION,
+            "conversation": self.conversation,
+            "interactions": self.interactions,
+        }
+        self.path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    def record(self, kind: str, request: Dict, call: Callable[[], Dict]) -> Dict:
+        started = time.perf_counter()
+        response = call()
+        latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        with self._lock:
+            self.interactions.append({
+                "kind": kind,
+                "key": request_key(kind, request),
+                "request": request,
+                "response": response,
+                "latency_ms": latency_ms,
+            })
+            self.save()
+        return response
+
+    def replay(self, kind: str, request: Dict) -> Dict:
+        key = request_key(kind, request)
+        with self._lock:
+            candidates = [
+                index for index, item in enumerate(self.interactions)
+                if index not in self._used and item["kind"] == kind
+            ]
+            match = next((i for i in candidates if self.interactions[i]["key"] == key), None)
+            if match is None and candidates:
+                # Request drifted (e.g. a prompt edit); serve the next recorded
+                # interaction of the same kind and report the drift.
+                match = candidates[0]
+                self.mismatches.append({
+                    "kind": kind,
+                    "recorded_key": self.interactions[match]["key"],
+                    "replayed_key": key,
+                })
+            if match is None:
+                raise CassetteMiss(f"No recorded {kind} interaction left in {self.path}")
+            self._used.add(match)
+            item = self.interactions[match]
+            self.virtual_upstream_ms += item.get("latency_ms", 0.0)
+            return item["response"]
+
+    def call(self, kind: str, request: Dict, call: Callable[[], Dict]) -> Dict:
+        if self.mode == "record":
+            return self.record(kind, request, call)
+        return self.replay(kind, request)
+
+    def llm_client(self, build_client: Callable[[], object]):
+        return _CassetteLLMClient(self, build_client)
+
+
+class _CassetteCompletions:
+    def __init__(self, cassette: Cassette, build_client: Callable[[], object]):
+        self._cassette = cassette
+        self._build_client = build_client
+
+    def create(self, **kwargs):
+        request = {
+            "model": kwargs.get("model"),
+            "messages": kwargs.get("messages"),
+            "temperature": kwargs.get("temperature"),
+        }
+
+        def call():
+            resp = self._build_client().chat.completions.create(**kwargs)
+            return {"content": resp.choices[0].message.content}
+
+        response = self._cassette.call("llm", request, call)
+        message = SimpleNamespace(content=response["content"], role="assistant")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, index=0)])
+
+
+class _CassetteLLMClient:
+    """Quacks like the subset of `openai.OpenAI` used by the graph nodes"""
+
+    def __init__(self, cassette: Cassette, build_client: Callable[[], object]):
+        self.chat = SimpleNamespace(completions=_CassetteCompletions(cassette, build_client))
+
+
+def active() -> Optional[Cassette]:
+    """The cassette in use, activating one from the environment on first use"""
+    global _active
+    with _active_lock:
+        if _active is None:
+            mode = os.getenv("CASSETTE_MODE", "off").lower()
+            path = os.getenv("CASSETTE_PATH")
+            if mode in ("record", "replay") and path:
+                _active = Cassette(path, mode)
+        return _active
+
+
+@contextmanager
+def use_cassette(path, mode: str):
+    """Route upstream calls through a cassette for the duration of the block"""
+    global _active
+    cassette = Cassette(path, mode)
+    with _active_lock:
+        previous, _active = _active, cassette
+    try:
+        yield cassette
+    finally:
+        with _active_lock:
+            _active = previous
+        if mode == "record":
+            cassette.save()
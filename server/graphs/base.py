@@ -3,11 +3,16 @@ Base classes and utilities for LangGraph nodes
 """
 import os
 import json
+from functools import lru_cache
 from typing import TypedDict, Dict, Any
 from typing_extensions import Annotated
 from langgraph.graph.message import add_messages
 from openai import OpenAI
 
+import cassettes
+import resilience
+from tracing import span, traceparent
+
 
 class GraphState(TypedDict):
     """Base state for all graphs"""
@@ -19,7 +24,16 @@ class GraphState(TypedDict):
 
 
 def build_openai_client() -> OpenAI:
-    """Build OpenAI client with OpenRouter configuration"""
+    """Build OpenAI client, routed through the active record/replay cassette if any"""
+    cassette = cassettes.active()
+    if cassette is not None:
+        return cassette.llm_client(_build_openai_client)
+    return _build_openai_client()
+
+
+@lru_cache(maxsize=1)
+def _build_openai_client() -> OpenAI:
+    """Build OpenAI client with OpenRouter configuration (shared, keeps its connection pool)"""
     from dotenv import load_dotenv
     from pathlib import Path
     
@@ -28,7 +42,17 @@ def build_openai_client() -> OpenAI:
     if not api_key:
         raise RuntimeError("OPEN_ROUTER_TOKEN chưa được cấu hình trong server/.env")
     base_url = os.getenv("OPENAI_BASE_URL", "https://openrouter.ai/api/v1")
-    return OpenAI(api_key=api_key, base_url=base_url)
+    # Retries are off by default so a call never outlives its timeout budget
+    max_retries = int(os.getenv("OPENROUTER_MAX_RETRIES", "0"))
+    return OpenAI(api_key=api_key, base_url=base_url, max_retries=max_retries)
+
+
+def create_chat_completion(client: OpenAI, **kwargs):
+    """Call the LLM through the openrouter circuit breaker with a budgeted timeout"""
+    return resilience.call(
+        "openrouter",
+        lambda timeout: client.chat.completions.create(timeout=timeout, **kwargs),
+    )
 
 
 def get_openai_config():
@@ -40,6 +64,42 @@ def get_openai_config():
     }
 
 
+def _request_image_generation(description: str) -> dict:
+    """Call the backend image generation endpoint (loopback HTTP)"""
+    import requests
+
+    headers = {"Content-Type": "application/json", **resilience.deadline_header()}
+    if traceparent():
+        headers["traceparent"] = traceparent()
+    with span("http.loopback.generate_image"):
+        image_response = resilience.call(
+            "image_loopback",
+            lambda timeout: requests.post(
+                "http://localhost:8000/api/generate-image",
+                json={"story_prompt": description},
+                headers=headers,
+                timeout=timeout
+            ),
+            is_failure=lambda response: response.status_code >= 500,
+        )
+    if image_response.status_code != 200:
+        raise RuntimeError(f"Image generation failed: HTTP {image_response.status_code}")
+    image_data = image_response.json()
+    return {
+        "image_base64": image_data.get("image_base64", ""),
+        "mime_type": image_data.get("mime_type", "image/jpeg"),
+    }
+
+
+def generate_nft_image(description: str) -> dict:
+    """Generate an NFT image for a description, routed through the active cassette if any"""
+    cassette = cassettes.active()
+    if cassette is not None:
+        return cassette.call("image", {"description": description},
+                             lambda: _request_image_generation(description))
+    return _request_image_generation(description)
+
+
 def extract_user_text(message) -> str:
     """Extract user text from various message formats"""
     if isinstance(message, dict):
@@ -0,0 +1,148 @@
+"""
+Speculative NFT image generation.
+
+While the NFT conversation is still collecting details, the model reports its
+current name/description draft. Once a complete draft has been stable for
+SPECULATIVE_IMAGE_STABLE_TURNS turns (default 2: the same draft on two
+consecutive turns), image generation starts in the background. On
+confirmation the pending image is reused if the description still matches;
+otherwise it is cancelled and discarded.
+
+Futures live in a module-level registry; session state (nft_info) only holds
+the job id and the description it was started for.
+"""
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, Optional, Tuple
+
+import resilience
+import tracing
+from .base import generate_nft_image
+
+ENABLED = os.getenv("SPECULATIVE_IMAGE_ENABLED", "true").lower() == "true"
+STABLE_TURNS = int(os.getenv("SPECULATIVE_IMAGE_STABLE_TURNS", "2"))
+WAIT_TIMEOUT = float(os.getenv("SPECULATIVE_IMAGE_WAIT_SECONDS", "120"))
+# Unclaimed results are dropped after this long (abandoned conversations)
+JOB_TTL = float(os.getenv("SPECULATIVE_IMAGE_TTL_SECONDS", "900"))
+
+DRAFT_PATTERN = re.compile(r"<nft_draft>(.*?)</nft_draft>", re.DOTALL)
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SPECULATIVE_IMAGE_WORKERS", "2")),
+    thread_name_prefix="image-prefetch",
+)
+_jobs: Dict[str, Tuple[Future, float]] = {}
+_lock = threading.Lock()
+
+
+def normalize(description: str) -> str:
+    return " ".join((description or "").split()).casefold()
+
+
+def extract_draft(content: str) -> Tuple[str, Optional[Dict]]:
+    """Strip the model's <nft_draft> annotation from a reply and parse it"""
+    if not isinstance(content, str):
+        return content, None
+    match = DRAFT_PATTERN.search(content)
+    if not match:
+        return content, None
+    cleaned = DRAFT_PATTERN.sub("", content).strip()
+    try:
+        draft = json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return cleaned, None
+    if not isinstance(draft, dict) or not draft.get("name") or not draft.get("description"):
+        return cleaned, None
+    return cleaned, {"name": str(draft["name"]), "description": str(draft["description"])}
+
+
+def _generate(description: str) -> dict:
+    with tracing.collect("speculative_image"):
+        return generate_nft_image(description)
+
+
+def _cleanup(now: float):
+    for job_id, (future, created_at) in list(_jobs.items()):
+        if now - created_at > JOB_TTL:
+            future.cancel()
+            del _jobs[job_id]
+
+
+def start(description: str) -> str:
+    job_id = secrets.token_hex(8)
+    with _lock:
+        _cleanup(time.monotonic())
+        _jobs[job_id] = (_executor.submit(_generate, description), time.monotonic())
+    print(f"🔮 Speculative image generation started ({job_id}) for: {description}")
+    return job_id
+
+
+def discard(speculative: Optional[Dict]):
+    """Cancel a pending job (or drop its finished result)"""
+    if not speculative:
+        return
+    with _lock:
+        job = _jobs.pop(speculative.get("job_id"), None)
+    if job is not None:
+        cancelled = job[0].cancel()
+        print(f"🔮 Discarded speculative image {speculative.get('job_id')} (cancelled before start: {cancelled})")
+
+
+def claim(speculative: Optional[Dict], description: str) -> Optional[dict]:
+    """Image data from the speculative job if it was started for this description"""
+    if not speculative:
+        return None
+    if normalize(speculative.get("description", "")) != normalize(description):
+        discard(speculative)
+        return None
+    with _lock:
+        job = _jobs.pop(speculative.get("job_id"), None)
+    if job is None:
+        return None
+    # Never wait past the request deadline
+    timeout = WAIT_TIMEOUT
+    left = resilience.remaining()
+    if left is not None:
+        timeout = min(timeout, max(left, 0))
+    try:
+        with tracing.span("image_prefetch.wait", ready=job[0].done()):
+            image_data = job[0].result(timeout=timeout)
+        print(f"🔮 Reusing speculative image {speculative.get('job_id')}")
+        return image_data
+    except FutureTimeout:
+        job[0].cancel()
+        print(f"❌ Speculative image {speculative.get('job_id')} timed out")
+    except Exception as e:
+        print(f"❌ Speculative image {speculative.get('job_id')} failed: {e}")
+    return None
+
+
+def track_draft(nft_info: Dict, draft: Optional[Dict]) -> Dict:
+    """Update draft stability in nft_info and start/cancel speculative generation"""
+    updated = dict(nft_info)
+    if draft is None:
+        return updated
+
+    previous = updated.get("draft") or {}
+    if normalize(previous.get("description", "")) == normalize(draft["description"]):
+        updated["draft_stable_turns"] = updated.get("draft_stable_turns", 0) + 1
+    else:
+        updated["draft_stable_turns"] = 1
+    updated["draft"] = draft
+
+    speculative = updated.get("speculative_image")
+    if speculative and normalize(speculative.get("description", "")) != normalize(draft["description"]):
+        discard(speculative)
+        speculative = updated["speculative_image"] = None
+
+    if ENABLED and speculative is None and updated["draft_stable_turns"] >= STABLE_TURNS:
+        updated["speculative_image"] = {
+            "job_id": start(draft["description"]),
+            "description": draft["description"],
+        }
+    return updated
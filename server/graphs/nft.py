@@ -7,9 +7,15 @@ from langgraph.graph import StateGraph, START
 from openai import OpenAI
 from langchain_core.messages import AIMessage
 
-from .base import GraphState, build_openai_client, get_openai_config, extract_user_text
+from .base import (
+    GraphState, build_openai_client, get_openai_config, extract_user_text,
+    generate_nft_image, create_chat_completion,
+)
+from tracing import span, traced
+from . import image_prefetch
 
 
+@traced("nft.route")
 def nft_route_decision(state: GraphState) -> str:
     """Route messages for NFT operations"""
     print(f"🚦 NFT_ROUTE: Analyzing NFT message routing")
@@ -27,6 +33,7 @@ def nft_route_decision(state: GraphState) -> str:
     return "nft_collect_info"
 
 
+@traced("nft.nft_collect_info")
 def nft_collect_info_node(state: GraphState) -> GraphState:
     """Collect NFT information step by step"""
     print(f"🔄 NFT_COLLECT_INFO: Processing NFT creation request")
@@ -70,19 +77,24 @@ AND the user says things like "yes", "create image", "let's mint", "move to mint
 **If still missing info**: Ask for name and description in a friendly way.
 **If ready**: Return the JSON above immediately.
 
+**Draft tracking**: When you are NOT returning the JSON above but the conversation already contains both a name and a description (provided by the user or suggested by you), end your reply with exactly one line:
+<nft_draft>{{"name": "[current name]", "description": "[current description]"}}</nft_draft>
+
 You ARE an NFT creation assistant, not a transfer assistant."""
 
         print(f"🔄 Calling OpenAI API for NFT info collection...")
-        resp = client.chat.completions.create(
-            extra_headers={"HTTP-Referer": config["referer"], "X-Title": config["title"]},
-            extra_body={},
-            model=config["model"],
-            messages=[
-                {"role": "system", "content": nft_system_prompt},
-                {"role": "user", "content": user_text}
-            ],
-            temperature=0.2,
-        )
+        with span("llm.chat_completion", model=config["model"]):
+            resp = create_chat_completion(
+                client,
+                extra_headers={"HTTP-Referer": config["referer"], "X-Title": config["title"]},
+                extra_body={},
+                model=config["model"],
+                messages=[
+                    {"role": "system", "content": nft_system_prompt},
+                    {"role": "user", "content": user_text}
+                ],
+                temperature=0.2,
+            )
         
         content = ""
         try:
@@ -91,6 +103,7 @@ You ARE an NFT creation assistant, not a transfer assistant."""
             content = resp if isinstance(resp, str) else str(resp)
         
         print(f"🔄 OpenAI response: {content}")
+        content, draft = image_prefetch.extract_draft(content)
         
         # Analyze the conversation to determine next step and collect info
         conversation_text = ""
@@ -134,31 +147,20 @@ You ARE an NFT creation assistant, not a transfer assistant."""
                 nft_info = nft_response.get("nft_creation_intent", {})
                 print(f"🔄 AI decided we have enough info: {nft_info}")
                 
-                # Generate image using the description
+                # Reuse the speculative image if it was started for this description,
+                # otherwise generate it now
                 try:
-                    print(f"🔄 Generating image for description: {nft_info.get('description', '')}")
-                    import requests
-                    
-                    # Call the image generation API
-                    image_response = requests.post(
-                        "http://localhost:8000/api/generate-image",
-                        json={"story_prompt": nft_info.get('description', '')},
-                        headers={"Content-Type": "application/json"}
+                    image_data = image_prefetch.claim(
+                        updated_nft_info.get("speculative_image"), nft_info.get('description', '')
                     )
-                    
-                    if image_response.status_code == 200:
-                        image_data = image_response.json()
-                        nft_info["image_url"] = image_data.get("image_url", "")
-                        nft_info["image_base64"] = image_data.get("image_base64", "")
-                        print(f"🔄 Image generated successfully")
-                    else:
-                        print(f"❌ Image generation failed: {image_response.status_code}")
-                        nft_info["image_url"] = ""
-                        nft_info["image_base64"] = ""
-                        
+                    if image_data is None:
+                        print(f"🔄 Generating image for description: {nft_info.get('description', '')}")
+                        image_data = generate_nft_image(nft_info.get('description', ''))
+                    nft_info["image_base64"] = image_data.get("image_base64", "")
+                    nft_info["mime_type"] = image_data.get("mime_type", "image/jpeg")
+                    print(f"🔄 Image generated successfully")
                 except Exception as e:
                     print(f"❌ Error generating image: {e}")
-                    nft_info["image_url"] = ""
                     nft_info["image_base64"] = ""
                 
                 # Update the response with image data
@@ -173,6 +175,9 @@ You ARE an NFT creation assistant, not a transfer assistant."""
         except json.JSONDecodeError:
             print(f"🔄 JSON parse failed, returning as chat message")
         
+        # Start (or cancel) background image generation for the current draft
+        updated_nft_info = image_prefetch.track_draft(updated_nft_info, draft)
+        
         # Return as regular chat message with updated state
         return {
             "messages": [AIMessage(content=content)],
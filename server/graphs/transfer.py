@@ -2,13 +2,51 @@
 Transfer Graph for handling SUI token transfers
 """
 import json
-from typing import Dict, Any
+import os
+from typing import Dict, Any, List, Optional
 from langgraph.graph import StateGraph, START
 from openai import OpenAI
 
-from .base import GraphState, build_openai_client, get_openai_config, extract_user_text
+from .base import GraphState, build_openai_client, get_openai_config, extract_user_text, create_chat_completion
+from tracing import span, traced
+from sui_rpc import get_gateway, is_sui_address, mist_to_sui, sui_to_mist
 
+# Gas units kept in reserve on top of the transferred amount
+GAS_UNITS_RESERVE = int(os.getenv("TRANSFER_GAS_UNITS_RESERVE", "2000"))
 
+
+def check_balance(wallet_address: str, amounts: List) -> Optional[dict]:
+    """transfer_error payload if the on-chain balance cannot cover amounts plus gas.
+
+    Returns None when the transfer is affordable or the check cannot be made
+    (unknown wallet, RPC unavailable) so the LLM flow proceeds as before.
+    """
+    if not amounts or not is_sui_address(wallet_address):
+        return None
+    try:
+        with span("transfer.balance_check"):
+            gateway = get_gateway()
+            balance, gas_price = gateway.get_balance_and_gas_price(wallet_address)
+            gas_reserve = gas_price * GAS_UNITS_RESERVE
+            required = sum(sui_to_mist(amount) for amount in amounts) + gas_reserve
+    except Exception as e:
+        print(f"⚠️ Balance check skipped: {e}")
+        return None
+
+    print(f"🔄 On-chain balance: {mist_to_sui(balance)} SUI, required: {mist_to_sui(required)} SUI")
+    if required <= balance:
+        return None
+    return {
+        "type": "transfer_error",
+        "error": "insufficient_balance",
+        "message": f"Insufficient balance: you have {mist_to_sui(balance)} SUI but this transfer needs "
+                   f"{mist_to_sui(required)} SUI including gas",
+        "balance": mist_to_sui(balance),
+        "required": mist_to_sui(required),
+    }
+
+
+@traced("transfer.route")
 def transfer_route_decision(state: GraphState) -> str:
     """Route messages for transfer operations"""
     print(f"🚦 TRANSFER_ROUTE: Analyzing transfer message routing")
@@ -26,6 +64,7 @@ def transfer_route_decision(state: GraphState) -> str:
     return "transfer_handler"
 
 
+@traced("transfer.transfer_handler")
 def transfer_handler_node(state: GraphState) -> GraphState:
     """Handle transfer operations and extract transfer intent"""
     print(f"🔄 TRANSFER_HANDLER: Processing transfer request")
@@ -87,16 +126,18 @@ def transfer_handler_node(state: GraphState) -> GraphState:
 - Always set requires_confirmation to true"""
 
         print(f"🔄 Calling OpenAI API for transfer analysis...")
-        resp = client.chat.completions.create(
-            extra_headers={"HTTP-Referer": config["referer"], "X-Title": config["title"]},
-            extra_body={},
-            model=config["model"],
-            messages=[
-                {"role": "system", "content": transfer_system_prompt},
-                {"role": "user", "content": user_text}
-            ],
-            temperature=0.2,
-        )
+        with span("llm.chat_completion", model=config["model"]):
+            resp = create_chat_completion(
+                client,
+                extra_headers={"HTTP-Referer": config["referer"], "X-Title": config["title"]},
+                extra_body={},
+                model=config["model"],
+                messages=[
+                    {"role": "system", "content": transfer_system_prompt},
+                    {"role": "user", "content": user_text}
+                ],
+                temperature=0.2,
+            )
         
         content = ""
         try:
@@ -136,6 +177,16 @@ def transfer_handler_node(state: GraphState) -> GraphState:
                             "message": f"Invalid wallet address format: {recipient.get('to_address', '')}"
                         })}]}
             
+            # Check the amounts the model extracted against the on-chain balance
+            intent = transfer_intent.get("transfer_intent", {})
+            if "recipients" in intent:
+                intent_amounts = [recipient.get("amount", 0) for recipient in intent["recipients"]]
+            else:
+                intent_amounts = [intent.get("amount", 0)]
+            balance_error = check_balance(state.get("wallet_address", ""), intent_amounts)
+            if balance_error:
+                return {"messages": [{"role": "assistant", "content": json.dumps(balance_error)}]}
+            
             # Create response with proper message
             wallet_address = state.get("wallet_address", "[user_wallet_address]")
             print(f"🔄 Wallet address from state: {wallet_address}")
@@ -0,0 +1,144 @@
+"""
+Idempotency keys for non-idempotent endpoints.
+
+A client may send an `Idempotency-Key` header. The first request with a key
+runs normally; a repeat arriving while it is still running waits for and
+shares its result, and a repeat arriving later (within the TTL) gets the
+stored result without re-running the handler. Replays are flagged with the
+`Idempotent-Replayed: true` response header.
+
+Keys are scoped per caller (wallet address, or client IP when the body has
+none), so two clients that pick the same key never see each other's results.
+A waiting repeat holds a worker thread, so it gives up with 409 after
+IDEMPOTENCY_WAIT_SECONDS or when its own request deadline runs out.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import orjson
+from fastapi import HTTPException, Request, Response
+
+import resilience
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "done", "result", "expires_at")
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.result = None
+        self.expires_at = None  # set once the result is stored
+
+
+class IdempotencyStore:
+    """Short-lived result cache with in-flight request coalescing"""
+
+    def __init__(self, ttl_seconds: float = 600, max_entries: int = 10000, wait_timeout: float = 30):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Stored keys in expiry order (the TTL is constant, so insertion order)
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float):
+        while self._expiry:
+            key, expires_at = next(iter(self._expiry.items()))
+            if expires_at > now:
+                break
+            self._expiry.popitem(last=False)
+            self._entries.pop(key, None)
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            self._expiry.pop(key, None)
+
+    def run(self, key: str, fingerprint: str, fn: Callable[[], dict],
+            should_store: Callable[[dict], bool] = lambda result: True):
+        """Run `fn` once per key; returns (result, replayed)"""
+        with self._lock:
+            now = time.monotonic()
+            self._evict(now)
+            entry = self._entries.get(key)
+            if entry is not None and entry.fingerprint != fingerprint:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was reused with a different request body")
+            owner = entry is None
+            if owner:
+                entry = self._entries[key] = _Entry(fingerprint)
+
+        if not owner:
+            wait = self.wait_timeout
+            left = resilience.remaining()
+            if left is not None:
+                wait = min(wait, max(left, 0))
+            if not entry.done.wait(wait):
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+            return entry.result, True
+
+        try:
+            result = fn()
+        except BaseException:
+            with self._lock:
+                self._entries.pop(key, None)
+            entry.result = {"success": False, "error": "Original request failed"}
+            entry.done.set()
+            raise
+
+        entry.result = result
+        with self._lock:
+            if should_store(result):
+                entry.expires_at = time.monotonic() + self.ttl_seconds
+                self._expiry[key] = entry.expires_at
+            else:
+                # Waiters share this result, but a later retry runs again
+                self._entries.pop(key, None)
+        entry.done.set()
+        return result, False
+
+
+store = IdempotencyStore(
+    ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600")),
+    max_entries=int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000")),
+    wait_timeout=float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30")),
+)
+
+
+def caller_scope(name: str, http_request: Request, wallet_address: Optional[str] = None) -> str:
+    """Scope for `name` private to one caller: their wallet, else their client IP"""
+    if wallet_address:
+        return f"{name}:{wallet_address.lower()}"
+    forwarded = http_request.headers.get("x-forwarded-for", "")
+    client = forwarded.split(",")[0].strip() or (http_request.client.host if http_request.client else "unknown")
+    return f"{name}:ip:{client}"
+
+
+def fingerprint(payload) -> str:
+    """Stable hash of a request body (pydantic model or plain dict)"""
+    if hasattr(payload, "model_dump"):
+        payload = payload.model_dump()
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def run_idempotent(scope: str, key: Optional[str], payload, response: Response, fn: Callable[[], dict]) -> dict:
+    """Run an endpoint body under an optional Idempotency-Key"""
+    if not key:
+        return fn()
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+    result, replayed = store.run(
+        f"{scope}:{key}",
+        fingerprint(payload),
+        fn,
+        # Failed attempts are not cached so a client retry can succeed
+        should_store=lambda result: isinstance(result, dict) and bool(result.get("success")),
+    )
+    response.headers[REPLAYED_HEADER] = "true" if replayed else "false"
+    return result
@@ -0,0 +1,94 @@
+"""
+NFT indexer: ingests NFTCreated events into a local SQLite store and serves
+paginated gallery queries.
+
+Configuration:
+    INDEXER_SOURCE         off (default), rpc or fixture
+    INDEXER_DB_PATH        SQLite file (default ./nft_index.sqlite3)
+    INDEXER_FIXTURE_PATH   JSON event feed for the fixture source
+    INDEXER_POLL_SECONDS   delay between catch-up rounds (default 10)
+    SUI_RPC_URL            fullnode for the rpc source
+    NFT_PACKAGE_ID         package that emits nft_mint::NFTCreated
+"""
+import os
+import threading
+import time
+from typing import Optional
+
+from sui_rpc import DEFAULT_RPC_URL
+from .sources import FixtureEventSource, SuiRpcEventSource, nft_created_event_type
+from .store import InvalidCursor, NFTIndexStore
+
+BATCH_SIZE = 50
+
+
+class NFTIndexer:
+    """Pulls events from a source into the store, resuming from the saved cursor"""
+
+    def __init__(self, store: NFTIndexStore, source, poll_seconds: float = 10.0):
+        self.store = store
+        self.source = source
+        self.poll_seconds = poll_seconds
+        self.last_sync_at = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sync_once(self) -> int:
+        """Catch up to the head of the source; returns the number of new NFTs"""
+        inserted = 0
+        cursor = self.store.get_cursor(self.source.name)
+        while True:
+            events, next_cursor, has_next = self.source.fetch(cursor, BATCH_SIZE)
+            inserted += self.store.ingest(self.source.name, events, next_cursor)
+            if not has_next or next_cursor == cursor:
+                break
+            cursor = next_cursor
+        self.last_sync_at = int(time.time() * 1000)
+        return inserted
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                inserted = self.sync_once()
+                self.last_error = None
+                if inserted:
+                    print(f"📇 Indexed {inserted} new NFTs from {self.source.name}")
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"❌ NFT indexer sync failed: {e}")
+            self._stop.wait(self.poll_seconds)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="nft-indexer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self) -> dict:
+        return {
+            "source": self.source.name,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "poll_seconds": self.poll_seconds,
+            "last_sync_at": self.last_sync_at,
+            "last_error": self.last_error,
+            **self.store.stats(),
+        }
+
+
+def build_indexer_from_env() -> Optional[NFTIndexer]:
+    """Create the indexer configured by INDEXER_* variables, or None when disabled"""
+    kind = os.getenv("INDEXER_SOURCE", "off").lower()
+    if kind == "off":
+        return None
+    if kind == "fixture":
+        source = FixtureEventSource(os.getenv("INDEXER_FIXTURE_PATH", "./nft_events.json"))
+    else:
+        source = SuiRpcEventSource(os.getenv("SUI_RPC_URL", DEFAULT_RPC_URL), nft_created_event_type())
+    store = NFTIndexStore(os.getenv("INDEXER_DB_PATH", "./nft_index.sqlite3"))
+    return NFTIndexer(store, source, float(os.getenv("INDEXER_POLL_SECONDS", "10")))
+
+
+__all__ = ["NFTIndexer", "NFTIndexStore", "InvalidCursor", "build_indexer_from_env"]
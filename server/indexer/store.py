@@ -0,0 +1,115 @@
+"""
+SQLite store for indexed NFTs and source checkpoints
+"""
+import base64
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nfts (
+    nft_id TEXT PRIMARY KEY,
+    creator TEXT NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    tx_digest TEXT NOT NULL DEFAULT '',
+    event_seq TEXT NOT NULL DEFAULT '',
+    timestamp_ms INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_nfts_creator_time ON nfts (creator, timestamp_ms DESC, nft_id DESC);
+CREATE INDEX IF NOT EXISTS idx_nfts_time ON nfts (timestamp_ms DESC, nft_id DESC);
+CREATE TABLE IF NOT EXISTS cursors (
+    source TEXT PRIMARY KEY,
+    cursor TEXT,
+    updated_at INTEGER NOT NULL
+);
+"""
+
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that could not be decoded"""
+
+
+def encode_page_cursor(timestamp_ms: int, nft_id: str) -> str:
+    raw = json.dumps([timestamp_ms, nft_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_page_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp_ms, nft_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return int(timestamp_ms), str(nft_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+class NFTIndexStore:
+    """NFTs keyed by object id, indexed by (creator, time) for keyset pagination"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def get_cursor(self, source: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT cursor FROM cursors WHERE source = ?", (source,)).fetchone()
+        return row["cursor"] if row else None
+
+    def ingest(self, source: str, events: List[Dict], next_cursor: Optional[str]) -> int:
+        """Insert a batch and advance the source checkpoint in one transaction"""
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO nfts (nft_id, creator, name, tx_digest, event_seq, timestamp_ms) "
+                "VALUES (:nft_id, :creator, :name, :tx_digest, :event_seq, :timestamp_ms)",
+                events,
+            )
+            inserted = self._conn.total_changes - before
+            self._conn.execute(
+                "INSERT INTO cursors (source, cursor, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(source) DO UPDATE SET cursor = excluded.cursor, updated_at = excluded.updated_at",
+                (source, next_cursor, int(time.time() * 1000)),
+            )
+        return inserted
+
+    def page(self, creator: Optional[str] = None, limit: int = 20, cursor: Optional[str] = None) -> Dict:
+        """Newest-first page of NFTs, optionally for one creator"""
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        clauses, params = [], []
+        if creator:
+            clauses.append("creator = ?")
+            params.append(creator.lower())
+        if cursor:
+            timestamp_ms, nft_id = decode_page_cursor(cursor)
+            clauses.append("(timestamp_ms < ? OR (timestamp_ms = ? AND nft_id < ?))")
+            params.extend([timestamp_ms, timestamp_ms, nft_id])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = (
+            "SELECT nft_id, creator, name, tx_digest, event_seq, timestamp_ms FROM nfts "
+            f"{where} ORDER BY timestamp_ms DESC, nft_id DESC LIMIT ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(query, (*params, limit + 1)).fetchall()
+
+        items = [dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = encode_page_cursor(last["timestamp_ms"], last["nft_id"])
+        return {"items": items, "next_cursor": next_cursor}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM nfts").fetchone()[0]
+            cursors = [dict(row) for row in self._conn.execute("SELECT source, cursor, updated_at FROM cursors")]
+        return {"total_nfts": total, "cursors": cursors}
@@ -0,0 +1,142 @@
+"""
+Startup lifecycle: background warm-up, import timing and readiness tracking
+"""
+import importlib
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+# Modules that are imported lazily inside request handlers. Warm-up imports
+# them in the background so the first request does not pay the cost.
+HEAVY_IMPORTS = ["requests", "PIL.Image", "huggingface_hub"]
+
+_module_loaded_at = time.perf_counter()
+_lock = threading.Lock()
+_warmup_steps: List[Tuple[str, Callable[[], object], bool]] = []
+_warmup_thread = None
+
+_state = {
+    "status": "starting",  # starting -> warming -> ready | degraded
+    "started_at": datetime.now(timezone.utc).isoformat(),
+    "app_import_ms": None,
+    "warmup_started_at": None,
+    "warmup_finished_at": None,
+    "warmup_ms": None,
+    "import_times_ms": {},
+    "dependencies": {},
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def mark_app_loaded():
+    """Record how long it took to import the application module"""
+    with _lock:
+        _state["app_import_ms"] = round((time.perf_counter() - _module_loaded_at) * 1000, 2)
+
+
+def register_warmup(name: str, fn: Callable[[], object], required: bool = True):
+    """Register a warm-up step; required steps gate readiness"""
+    _warmup_steps.append((name, fn, required))
+    with _lock:
+        _state["dependencies"][name] = {"status": "pending", "required": required}
+
+
+def timed_import(module_name: str) -> float:
+    """Import a module and record how long the import took in milliseconds"""
+    started = time.perf_counter()
+    importlib.import_module(module_name)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    with _lock:
+        _state["import_times_ms"][module_name] = elapsed_ms
+    return elapsed_ms
+
+
+def _run_step(name: str, fn: Callable[[], object]):
+    started = time.perf_counter()
+    try:
+        fn()
+        status, error = "ok", None
+    except Exception as e:
+        status, error = "failed", str(e)
+        print(f"❌ Warm-up step {name} failed: {e}")
+        traceback.print_exc()
+    result = {"status": status, "duration_ms": round((time.perf_counter() - started) * 1000, 2)}
+    if error:
+        result["error"] = error
+    with _lock:
+        _state["dependencies"][name].update(result)
+
+
+def _warmup():
+    started = time.perf_counter()
+    print(f"🔥 Warm-up started ({len(_warmup_steps)} steps)")
+    for module_name in HEAVY_IMPORTS:
+        try:
+            elapsed_ms = timed_import(module_name)
+            print(f"🔥 Imported {module_name} in {elapsed_ms}ms")
+        except ImportError as e:
+            print(f"⚠️ Could not import {module_name}: {e}")
+            with _lock:
+                _state["import_times_ms"][module_name] = None
+
+    for name, fn, _required in _warmup_steps:
+        _run_step(name, fn)
+
+    with _lock:
+        required_ok = all(
+            dep["status"] == "ok"
+            for dep in _state["dependencies"].values()
+            if dep["required"]
+        )
+        _state["status"] = "ready" if required_ok else "degraded"
+        _state["warmup_finished_at"] = _now()
+        _state["warmup_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    print(f"🔥 Warm-up finished: {_state['status']} in {_state['warmup_ms']}ms")
+
+
+def start_warmup():
+    """Run all registered warm-up steps in a background thread"""
+    global _warmup_thread
+    with _lock:
+        if _warmup_thread is not None:
+            return
+        _state["status"] = "warming"
+        _state["warmup_started_at"] = _now()
+        _warmup_thread = threading.Thread(target=_warmup, name="warmup", daemon=True)
+    _warmup_thread.start()
+
+
+def is_ready() -> bool:
+    with _lock:
+        return _state["status"] == "ready"
+
+
+def liveness() -> Dict:
+    """Process is up and serving requests"""
+    return {
+        "status": "alive",
+        "timestamp": _now(),
+        "started_at": _state["started_at"],
+    }
+
+
+def readiness() -> Dict:
+    """Snapshot of warm-up progress and dependency state"""
+    with _lock:
+        return {
+            "status": _state["status"],
+            "ready": _state["status"] == "ready",
+            "timestamp": _now(),
+            "started_at": _state["started_at"],
+            "app_import_ms": _state["app_import_ms"],
+            "warmup_started_at": _state["warmup_started_at"],
+            "warmup_finished_at": _state["warmup_finished_at"],
+            "warmup_ms": _state["warmup_ms"],
+            "import_times_ms": dict(_state["import_times_ms"]),
+            "dependencies": {name: dict(dep) for name, dep in _state["dependencies"].items()},
+        }
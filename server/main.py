@@ -1,29 +1,47 @@
+# Imported first so app import time is measured from here
+import lifecycle
 import os
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
 from openai import OpenAI
 from typing_extensions import TypedDict, Annotated
-from typing import Dict
+from typing import Dict, List, Optional
 from langgraph.graph import StateGraph, START
 from langgraph.graph.message import add_messages
 
 # Import graph builders
 from graphs.transfer import build_transfer_graph
 from graphs.nft import build_nft_graph
-from graphs.base import GraphState
-from fastapi import FastAPI, UploadFile, File, Form
-from fastapi.staticfiles import StaticFiles
+from graphs import image_prefetch
+from graphs.base import GraphState, build_openai_client
+import profiler
+import resilience
+from indexer import InvalidCursor, build_indexer_from_env
+from batch_mint import BatchMintRequest, run_batch
+from sui_rpc import get_gateway, is_sui_address
+from static_files import CachedStaticFiles
+import tracing
+from fastapi import FastAPI, UploadFile, File, Form, Request, Response, Header, HTTPException
+from idempotency import caller_scope, run_idempotent, REPLAYED_HEADER
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from compression import CompressionMiddleware, compression_settings
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import base64
 import json
+import orjson
 
 
-app = FastAPI(title="Sui Chat Wallet Backend")
+# orjson-backed responses: large base64 payloads serialize without the stdlib encoder overhead
+app = FastAPI(title="Sui Chat Wallet Backend", default_response_class=ORJSONResponse)
 
 # Session storage for maintaining conversation state
 session_storage: Dict[str, dict] = {}
 
+# NFTCreated event indexer, started on startup unless INDEXER_SOURCE=off
+nft_indexer = None
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -36,8 +54,43 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Trace-Id", REPLAYED_HEADER],
 )
 
+# Compress large JSON payloads (base64 images) with brotli/gzip
+app.add_middleware(CompressionMiddleware, **compression_settings())
+
+# Overall per-request deadline that upstream timeout budgets are taken from
+app.add_middleware(resilience.DeadlineMiddleware)
+
+# Clients opt in to a per-request timing breakdown with this header
+DEBUG_TIMING_HEADER = "x-debug-timing"
+DEBUG_TIMING_ENABLED = os.getenv("DEBUG_TIMING_ENABLED", "false").lower() == "true"
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Open a root span per API request and optionally return its Server-Timing breakdown"""
+    if not request.url.path.startswith("/api/"):
+        return await call_next(request)
+
+    trace, tokens = tracing.start_trace(
+        f"{request.method} {request.url.path}", request.headers.get("traceparent")
+    )
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        tracing.end_trace(trace, tokens, **{"http.status_code": status_code})
+
+    response.headers["X-Trace-Id"] = trace.trace_id
+    if DEBUG_TIMING_ENABLED and request.headers.get(DEBUG_TIMING_HEADER):
+        response.headers["Server-Timing"] = trace.server_timing()
+        response.headers["Timing-Allow-Origin"] = "*"
+    return response
+
 
 class ChatRequest(BaseModel):
     message: str
@@ -47,6 +100,12 @@ class ChatRequest(BaseModel):
     mode: str = "transfer"
 
 
+class TransferConfirmation(BaseModel):
+    wallet_address: str
+    digest: Optional[str] = None
+    recipients: List[str] = []
+
+
 class ModelInfo(BaseModel):
     id: str
     name: str
@@ -55,32 +114,57 @@ class ModelInfo(BaseModel):
 class ImageGenerationRequest(BaseModel):
     story_prompt: str = None
     prompt: str = None
+    wallet_address: Optional[str] = None  # scopes Idempotency-Key to the caller
     
     def get_prompt(self) -> str:
         return self.story_prompt or self.prompt or ""
 
 
 def build_client() -> OpenAI:
-    load_dotenv(Path(__file__).with_name('.env'))
-    api_key = os.getenv("OPEN_ROUTER_TOKEN")
-    if not api_key:
-        raise RuntimeError("OPEN_ROUTER_TOKEN chưa được cấu hình trong server/.env")
-    base_url = os.getenv("OPENAI_BASE_URL", "https://openrouter.ai/api/v1")
-    return OpenAI(api_key=api_key, base_url=base_url)
-
-def build_huggingface_client():
-    """Initialize Hugging Face client for image generation"""
+    """Shared OpenRouter client (same instance the graph nodes use)"""
+    return build_openai_client()
+
+@lru_cache(maxsize=1)
+def huggingface_token() -> str:
+    """HF_TOKEN from the environment or server/.env (read once)"""
     load_dotenv(Path(__file__).with_name('.env'))
     hf_token = os.getenv("HF_TOKEN")
     if not hf_token:
         raise RuntimeError("HF_TOKEN chưa được cấu hình trong server/.env")
-    
+    return hf_token
+
+
+def _new_huggingface_client(timeout: float):
     from huggingface_hub import InferenceClient
-    client = InferenceClient(
+    return InferenceClient(
         provider="auto",
-        api_key=hf_token,
+        api_key=huggingface_token(),
+        timeout=timeout,
     )
-    return client
+
+
+@lru_cache(maxsize=1)
+def _shared_huggingface_client():
+    return _new_huggingface_client(resilience.upstream_timeout("huggingface"))
+
+
+def build_huggingface_client(timeout: Optional[float] = None):
+    """Hugging Face client for image generation (shared across requests).
+
+    A dedicated client is built only when the request budget is tighter than
+    the upstream's default timeout.
+    """
+    if timeout is None or timeout >= resilience.upstream_timeout("huggingface"):
+        return _shared_huggingface_client()
+    return _new_huggingface_client(timeout)
+
+
+@lru_cache(maxsize=None)
+def get_graph(mode: str):
+    """Return the compiled graph for a chat mode, compiling it only once"""
+    if mode == "nft":
+        return build_nft_graph()
+    return build_transfer_graph()
 
 
 def direct_test(client: OpenAI):
@@ -111,10 +195,19 @@ def get_models():
 
 
 @app.post("/api/generate-image")
-def generate_image(request: ImageGenerationRequest):
+def generate_image(request: ImageGenerationRequest, http_request: Request, response: Response,
+                   idempotency_key: Optional[str] = Header(None)):
+    """Generate image from story prompt; repeated Idempotency-Keys reuse the first result"""
+    scope = caller_scope("generate-image", http_request, request.wallet_address)
+    return run_idempotent(scope, idempotency_key, request, response,
+                          lambda: handle_generate_image(request))
+
+
+def handle_generate_image(request: ImageGenerationRequest):
     """Generate image from story prompt using Hugging Face Stable Diffusion 3.5"""
     try:
-        client = build_huggingface_client()
+        # Fail fast on missing configuration before touching the circuit breaker
+        huggingface_token()
         
         # Enhanced prompt for better image generation
         prompt_text = request.get_prompt()
@@ -129,14 +222,18 @@ def generate_image(request: ImageGenerationRequest):
         """
         
         # Generate image using Hugging Face Stable Diffusion XL with fixed parameters
-        image = client.text_to_image(
-            enhanced_prompt,
-            model="stabilityai/stable-diffusion-xl-base-1.0",
-            height=512,
-            width=512,
-            num_inference_steps=20,
-            guidance_scale=7.5
-        )
+        with tracing.span("hf.text_to_image", model="stabilityai/stable-diffusion-xl-base-1.0"):
+            image = resilience.call(
+                "huggingface",
+                lambda timeout: build_huggingface_client(timeout).text_to_image(
+                    enhanced_prompt,
+                    model="stabilityai/stable-diffusion-xl-base-1.0",
+                    height=512,
+                    width=512,
+                    num_inference_steps=20,
+                    guidance_scale=7.5
+                ),
+            )
         
         # Convert PIL Image to base64 for transmission
         import io
@@ -150,15 +247,17 @@ def generate_image(request: ImageGenerationRequest):
         # Keep the fixed size to avoid transaction size limit
         
         # Convert to base64 with lower quality to reduce size for blockchain
-        buffer = io.BytesIO()
-        image.save(buffer, format='JPEG', quality=60, optimize=True)
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+        with tracing.span("image.encode"):
+            buffer = io.BytesIO()
+            image.save(buffer, format='JPEG', quality=60, optimize=True)
+            # Encode straight from the buffer's memory instead of copying it out first
+            image_base64 = base64.b64encode(buffer.getbuffer()).decode('ascii')
         
+        # The payload is sent once; clients build the data URL from mime_type
         return {
             "success": True,
-            "image_url": f"data:image/jpeg;base64,{image_base64}",
             "image_base64": image_base64,
+            "mime_type": "image/jpeg",
             "prompt": enhanced_prompt
         }
         
@@ -171,7 +270,15 @@ def generate_image(request: ImageGenerationRequest):
 
 
 @app.post("/api/upload-image")
-def upload_image_to_host(request: dict):
+def upload_image_to_host(request: dict, http_request: Request, response: Response,
+                         idempotency_key: Optional[str] = Header(None)):
+    """Upload base64 image to freeimage.host; repeated Idempotency-Keys reuse the first result"""
+    scope = caller_scope("upload-image", http_request, request.get("wallet_address"))
+    return run_idempotent(scope, idempotency_key, request, response,
+                          lambda: handle_upload_image_to_host(request))
+
+
+def handle_upload_image_to_host(request: dict):
     """Upload base64 image to freeimage.host and return public URL"""
     try:
         import requests
@@ -184,9 +291,11 @@ def upload_image_to_host(request: dict):
                 "error": "No image data provided"
             }
         
-        # Remove data URL prefix if present
-        clean_base64 = image_base64.replace('data:image/jpeg;base64,', '')
-        clean_base64 = clean_base64.replace('data:image/png;base64,', '')
+        # Remove data URL prefix if present (single slice instead of full-string replaces)
+        if image_base64.startswith('data:'):
+            clean_base64 = image_base64[image_base64.find(',') + 1:]
+        else:
+            clean_base64 = image_base64
         
         # Get API key from environment
         api_key = os.getenv("FREEIMAGE_API_KEY")
@@ -205,7 +314,12 @@ def upload_image_to_host(request: dict):
         }
         
         # Upload to freeimage.host
-        response = requests.post('https://freeimage.host/api/1/upload', data=form_data)
+        with tracing.span("freeimage.upload"):
+            response = resilience.call(
+                "freeimage",
+                lambda timeout: requests.post('https://freeimage.host/api/1/upload', data=form_data, timeout=timeout),
+                is_failure=lambda response: response.status_code >= 500,
+            )
         
         if response.status_code != 200:
             return {
@@ -247,7 +361,15 @@ def upload_image_to_host(request: dict):
 
 
 @app.post("/api/chat")
-def chat(request: ChatRequest):
+def chat(request: ChatRequest, http_request: Request, response: Response,
+         idempotency_key: Optional[str] = Header(None)):
+    """Run one chat turn; a repeated Idempotency-Key returns the first turn's result instead of re-running it"""
+    scope = caller_scope("chat", http_request, request.wallet_address)
+    return run_idempotent(scope, idempotency_key, request, response,
+                          lambda: handle_chat(request))
+
+
+def handle_chat(request: ChatRequest):
     print(f"💬 CHAT_ENDPOINT: Received chat request")
     print(f"💬 Message: {request.message}")
     print(f"💬 Model: {request.model}")
@@ -295,6 +417,7 @@ def chat(request: ChatRequest):
     if (current_step.startswith("nft_") and is_transfer_intent) or \
        (current_step.startswith("transfer_") and is_nft_intent):
         print(f"💬 Topic change detected, resetting session state")
+        image_prefetch.discard(session.get("nft_info", {}).get("speculative_image"))
         session["messages"] = []
         session["nft_info"] = {}
         session["current_step"] = "initial"
@@ -308,11 +431,8 @@ def chat(request: ChatRequest):
     print(f"💬 Added user message to session")
     
     # Build and run graph with session state based on mode
-    print(f"💬 Building LangGraph for mode: {request.mode}")
-    if request.mode == "nft":
-        graph = build_nft_graph()
-    else:
-        graph = build_transfer_graph()
+    print(f"💬 Using LangGraph for mode: {request.mode}")
+    graph = get_graph("nft" if request.mode == "nft" else "transfer")
     
     graph_input = {
         "messages": session["messages"],
@@ -327,7 +447,8 @@ def chat(request: ChatRequest):
     
     # Run the graph
     try:
-        result = graph.invoke(graph_input)
+        with tracing.span("graph.invoke", mode=request.mode):
+            result = graph.invoke(graph_input)
         print(f"💬 Graph result: {result}")
         
         # Update session with new state
@@ -347,8 +468,8 @@ def chat(request: ChatRequest):
                 
                 # Check if content is JSON (structured response)
                 try:
-                    import json
-                    parsed_content = json.loads(content)
+                    with tracing.span("chat.parse_response"):
+                        parsed_content = orjson.loads(content)
                     if isinstance(parsed_content, dict) and "type" in parsed_content:
                         print(f"💬 Structured response detected: {parsed_content['type']}")
                         return {"success": True, "response": parsed_content}
@@ -373,6 +494,72 @@ def chat(request: ChatRequest):
         return {"success": False, "error": f"Graph execution failed: {str(e)}"}
 
 
+@app.get("/api/sui/wallets/{address}")
+def get_wallet(address: str):
+    """Cached SUI balance, SUI coin objects and per-coin-type balances for a wallet"""
+    if not is_sui_address(address):
+        return {"success": False, "error": "Invalid Sui address"}
+    try:
+        return {"success": True, "data": get_gateway().get_wallet_snapshot(address)}
+    except Exception as e:
+        return {"success": False, "error": f"Failed to load wallet: {str(e)}"}
+
+
+@app.post("/api/transfer/confirmed")
+def transfer_confirmed(request: TransferConfirmation):
+    """Drop cached balances/coins for the sender and recipients of a confirmed transfer"""
+    gateway = get_gateway()
+    for address in [request.wallet_address, *request.recipients]:
+        gateway.invalidate(address)
+    print(f"💸 Transfer confirmed ({request.digest}), invalidated {1 + len(request.recipients)} wallets")
+    return {"success": True}
+
+
+@app.post("/api/nft/batch-mint")
+def batch_mint(request: BatchMintRequest):
+    """Generate and upload images for many NFTs in parallel, streaming NDJSON progress.
+
+    The final `complete` event carries one mint_batch_to_sender transaction payload.
+    """
+    print(f"🧺 BATCH_MINT: {len(request.items)} items for {request.wallet_address}")
+    return StreamingResponse(
+        run_batch(
+            request,
+            generate_image=lambda description: handle_generate_image(ImageGenerationRequest(story_prompt=description)),
+            upload_image=lambda image_base64: handle_upload_image_to_host({"image_base64": image_base64}),
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+def nft_gallery_page(creator: Optional[str], limit: int, cursor: Optional[str]):
+    if nft_indexer is None:
+        return {"success": False, "error": "NFT indexer is disabled (set INDEXER_SOURCE)"}
+    try:
+        return {"success": True, "data": nft_indexer.store.page(creator=creator, limit=limit, cursor=cursor)}
+    except InvalidCursor as e:
+        return {"success": False, "error": str(e)}
+
+
+@app.get("/api/nfts")
+def list_nfts(limit: int = 20, cursor: Optional[str] = None):
+    """Newest NFTs across all creators, keyset-paginated via `cursor`"""
+    return nft_gallery_page(None, limit, cursor)
+
+
+@app.get("/api/wallets/{address}/nfts")
+def list_wallet_nfts(address: str, limit: int = 20, cursor: Optional[str] = None):
+    """NFTs minted by a wallet, newest first, keyset-paginated via `cursor`"""
+    return nft_gallery_page(address, limit, cursor)
+
+
+@app.get("/api/indexer/status")
+def indexer_status():
+    if nft_indexer is None:
+        return {"success": True, "data": {"enabled": False}}
+    return {"success": True, "data": {"enabled": True, **nft_indexer.status()}}
+
+
 @app.post("/api/upload/image")
 def upload_image(file: UploadFile = File(...)):
     """Upload and process image for NFT"""
@@ -387,7 +574,7 @@ def upload_image(file: UploadFile = File(...)):
             return {"success": False, "error": "File quá lớn (max 10MB)"}
         
         # Convert to base64 for storage
-        image_base64 = base64.b64encode(content).decode('utf-8')
+        image_base64 = base64.b64encode(content).decode('ascii')
         
         # Create data URL
         image_url = f"data:{file.content_type};base64,{image_base64}"
@@ -423,6 +610,42 @@ def main():
     print("[NFT Graph]", reply)
 
 
+def check_freeimage_config():
+    if not os.getenv("FREEIMAGE_API_KEY"):
+        raise RuntimeError("FREEIMAGE_API_KEY not configured")
+
+
+# Warm-up steps run in the background after startup; readiness waits for them
+lifecycle.register_warmup("openrouter_client", build_client)
+lifecycle.register_warmup("transfer_graph", lambda: get_graph("transfer"))
+lifecycle.register_warmup("nft_graph", lambda: get_graph("nft"))
+lifecycle.register_warmup("huggingface_client", build_huggingface_client, required=False)
+lifecycle.register_warmup("freeimage_config", check_freeimage_config, required=False)
+
+
+@app.on_event("startup")
+def start_warmup():
+    lifecycle.start_warmup()
+
+
+@app.on_event("startup")
+def start_nft_indexer():
+    global nft_indexer
+    try:
+        nft_indexer = build_indexer_from_env()
+    except Exception as e:
+        print(f"❌ Could not start NFT indexer: {e}")
+        return
+    if nft_indexer is not None:
+        nft_indexer.start()
+
+
+@app.on_event("shutdown")
+def stop_nft_indexer():
+    if nft_indexer is not None:
+        nft_indexer.stop()
+
+
 # Health check endpoint for deployment monitoring
 @app.get("/health")
 async def health_check():
@@ -430,17 +653,57 @@ async def health_check():
         "status": "healthy",
         "service": "sui-chat-wallet-backend",
         "version": "1.0.0",
-        "timestamp": "2025-01-03T22:00:00Z"
+        "timestamp": lifecycle.liveness()["timestamp"]
     }
 
 
+@app.get("/debug/profile")
+def debug_profile(seconds: float = 5.0, interval_ms: float = 10.0):
+    """Capture a short sampling profile of the live process (collapsed stacks)"""
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    try:
+        return {"success": True, "data": profiler.sample(seconds, interval_ms)}
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.get("/health/upstreams")
+async def health_upstreams():
+    """Circuit breaker state and timeout per upstream, for monitoring"""
+    return {"success": True, "data": resilience.breaker_states()}
+
+
+@app.get("/health/live")
+async def health_live():
+    """Liveness probe: the process is up, regardless of warm-up state"""
+    return lifecycle.liveness()
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness probe: 503 until warm-up has finished and required dependencies are ok"""
+    report = lifecycle.readiness()
+    return ORJSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
 # Mount static files (serve frontend) - must be after all API routes
 static_path = os.getenv("STATIC_FILES_PATH", "./static")
 if os.path.exists(static_path):
-    app.mount("/", StaticFiles(directory=static_path, html=True), name="static")
+    app.mount(
+        "/",
+        CachedStaticFiles(
+            directory=static_path,
+            html=True,
+            precompress=os.getenv("STATIC_PRECOMPRESS", "true").lower() == "true",
+        ),
+        name="static",
+    )
 else:
     print(f"Warning: Static files path {static_path} not found")
 
+lifecycle.mark_app_loaded()
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,57 @@
+"""
+Sampling profiler for the live process.
+
+Periodically snapshots the stacks of all threads (except the sampler itself)
+and aggregates them into collapsed-stack lines ("frame;frame;frame count"),
+the input format of flamegraph.pl / speedscope.
+"""
+import sys
+import threading
+import time
+from collections import Counter
+
+MAX_SECONDS = 30.0
+_profile_lock = threading.Lock()
+
+
+def _collapse(frame) -> str:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+def sample(seconds: float = 5.0, interval_ms: float = 10.0) -> dict:
+    """Sample all thread stacks for `seconds`; only one profile runs at a time"""
+    seconds = max(0.1, min(float(seconds), MAX_SECONDS))
+    interval = max(1.0, float(interval_ms)) / 1000
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("A profile is already being captured")
+    try:
+        own_id = threading.get_ident()
+        thread_names = {}
+        stacks = Counter()
+        samples = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                name = names.get(thread_id, str(thread_id))
+                thread_names[thread_id] = name
+                stacks[f"{name};{_collapse(frame)}"] += 1
+            samples += 1
+            time.sleep(interval)
+    finally:
+        _profile_lock.release()
+
+    return {
+        "seconds": seconds,
+        "interval_ms": interval * 1000,
+        "samples": samples,
+        "threads": sorted(set(thread_names.values())),
+        "collapsed": "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()),
+    }
@@ -0,0 +1,195 @@
+"""
+Record and replay graph conversations for offline latency/behavior regression checks.
+
+Record a conversation against the real upstreams (needs OPEN_ROUTER_TOKEN, and a
+running backend on :8000 for NFT image generation):
+
+    python replay.py record --mode nft --cassette cassettes/nft_mint.json \\
+        -m "create an NFT called Cyber Cat" -m "a neon cat on a rooftop" -m "yes, mint it"
+
+Replay it offline, report per-node CPU time and allocations, diff the outputs
+and optionally compare against a previous report:
+
+    python replay.py replay cassettes/nft_mint.json --output report.json
+    python replay.py replay cassettes/nft_mint.json --baseline report.json --threshold 0.25
+
+Replay exits non-zero when outputs differ from the recording, requests drifted
+from the cassette, or a node's CPU time regressed past the threshold.
+"""
+import argparse
+import difflib
+import json
+import sys
+import tracemalloc
+from typing import Dict, List
+
+import cassettes
+import tracing
+from graphs.base import extract_user_text
+from graphs.nft import build_nft_graph
+from graphs.transfer import build_transfer_graph
+
+DEFAULT_WALLET = "0x" + "0" * 64
+# Differences below this many CPU milliseconds are treated as noise
+MIN_REGRESSION_MS = 1.0
+
+
+def run_conversation(mode: str, turns: List[str], wallet_address: str, current_balance: str) -> List[Dict]:
+    """Drive a conversation through the graph the same way /api/chat does"""
+    graph = build_nft_graph() if mode == "nft" else build_transfer_graph()
+    state = {"messages": [], "nft_info": {}, "current_step": "initial"}
+    results = []
+
+    for index, message in enumerate(turns):
+        state["messages"] = list(state["messages"]) + [{"role": "user", "content": message}]
+        graph_input = {
+            **state,
+            "mode": mode,
+            "current_balance": current_balance,
+            "wallet_address": wallet_address,
+        }
+        with tracing.collect(f"turn-{index}") as trace:
+            result = graph.invoke(graph_input)
+
+        for key in ("messages", "nft_info", "current_step"):
+            if key in result:
+                state[key] = result[key]
+        messages = result.get("messages", [])
+        results.append({
+            "message": message,
+            "output": extract_user_text(messages[-1]) if messages else "",
+            "spans": [span.to_dict() for span in trace.finished_spans() if span is not trace.root],
+            "wall_ms": trace.root.duration_ms,
+        })
+    return results
+
+
+def summarize_spans(turn_results: List[Dict]) -> Dict[str, Dict]:
+    """Aggregate span timings per node/upstream name across all turns"""
+    nodes: Dict[str, Dict] = {}
+    for turn in turn_results:
+        for item in turn["spans"]:
+            node = nodes.setdefault(item["name"], {"calls": 0, "cpu_ms": 0.0, "wall_ms": 0.0, "alloc_bytes": 0})
+            node["calls"] += 1
+            node["cpu_ms"] = round(node["cpu_ms"] + (item["cpu_ms"] or 0.0), 3)
+            node["wall_ms"] = round(node["wall_ms"] + item["duration_ms"], 3)
+            node["alloc_bytes"] += item["alloc_bytes"] or 0
+    return nodes
+
+
+def diff_outputs(recorded: List[Dict], replayed: List[Dict]) -> List[Dict]:
+    diffs = []
+    for index, (before, after) in enumerate(zip(recorded, replayed)):
+        if before["output"] == after["output"]:
+            continue
+        diffs.append({
+            "turn": index,
+            "message": before["message"],
+            "diff": "\n".join(difflib.unified_diff(
+                before["output"].splitlines(), after["output"].splitlines(),
+                fromfile="recorded", tofile="replayed", lineterm="",
+            )),
+        })
+    return diffs
+
+
+def compare_to_baseline(nodes: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[Dict]:
+    regressions = []
+    for name, node in nodes.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        limit = before["cpu_ms"] * (1 + threshold)
+        if node["cpu_ms"] > limit and node["cpu_ms"] - before["cpu_ms"] > MIN_REGRESSION_MS:
+            regressions.append({"node": name, "baseline_cpu_ms": before["cpu_ms"], "cpu_ms": node["cpu_ms"]})
+    return regressions
+
+
+def record(args) -> int:
+    with cassettes.use_cassette(args.cassette, "record") as cassette:
+        results = run_conversation(args.mode, args.message, args.wallet, args.balance)
+        cassette.conversation = {
+            "mode": args.mode,
+            "wallet_address": args.wallet,
+            "current_balance": args.balance,
+            "turns": [{"message": r["message"], "output": r["output"]} for r in results],
+        }
+    print(f"📼 Recorded {len(results)} turns and {len(cassette.interactions)} upstream calls to {args.cassette}")
+    return 0
+
+
+def replay(args) -> int:
+    tracemalloc.start()
+    try:
+        with cassettes.use_cassette(args.cassette, "replay") as cassette:
+            conversation = cassette.conversation
+            recorded = conversation.get("turns", [])
+            results = run_conversation(
+                conversation.get("mode", "transfer"),
+                [turn["message"] for turn in recorded],
+                conversation.get("wallet_address", DEFAULT_WALLET),
+                conversation.get("current_balance", "0"),
+            )
+    finally:
+        tracemalloc.stop()
+
+    nodes = summarize_spans(results)
+    report = {
+        "cassette": args.cassette,
+        "turns": len(results),
+        "virtual_upstream_ms": round(cassette.virtual_upstream_ms, 2),
+        "nodes": nodes,
+        "output_diffs": diff_outputs(recorded, results),
+        "request_mismatches": cassette.mismatches,
+        "regressions": [],
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["regressions"] = compare_to_baseline(nodes, json.load(f).get("nodes", {}), args.threshold)
+
+    print(f"📼 Replayed {report['turns']} turns from {args.cassette} "
+          f"(recorded upstream time {report['virtual_upstream_ms']}ms)")
+    for name, node in sorted(nodes.items()):
+        print(f"  {name:<40} calls={node['calls']:<3} cpu={node['cpu_ms']:>9.3f}ms "
+              f"wall={node['wall_ms']:>9.3f}ms alloc={node['alloc_bytes']}B")
+    for item in report["output_diffs"]:
+        print(f"❌ Output changed on turn {item['turn']} ({item['message']!r}):\n{item['diff']}")
+    for item in report["request_mismatches"]:
+        print(f"⚠️ {item['kind']} request drifted from the recording ({item['recorded_key']} -> {item['replayed_key']})")
+    for item in report["regressions"]:
+        print(f"❌ CPU regression in {item['node']}: {item['baseline_cpu_ms']}ms -> {item['cpu_ms']}ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    failed = report["output_diffs"] or report["request_mismatches"] or report["regressions"]
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Record/replay graph conversations")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Record a conversation against live upstreams")
+    record_parser.add_argument("--mode", choices=["transfer", "nft"], default="transfer")
+    record_parser.add_argument("--cassette", required=True)
+    record_parser.add_argument("-m", "--message", action="append", required=True, help="User turn (repeatable)")
+    record_parser.add_argument("--wallet", default=DEFAULT_WALLET)
+    record_parser.add_argument("--balance", default="10")
+    record_parser.set_defaults(handler=record)
+
+    replay_parser = commands.add_parser("replay", help="Replay a cassette offline and report")
+    replay_parser.add_argument("cassette")
+    replay_parser.add_argument("--output", help="Write the JSON report here")
+    replay_parser.add_argument("--baseline", help="Previous JSON report to compare CPU time against")
+    replay_parser.add_argument("--threshold", type=float, default=0.25,
+                               help="Allowed relative CPU increase per node (default 0.25)")
+    replay_parser.set_defaults(handler=replay)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Timeout budgets and circuit breakers for upstream calls.
+
+Every request gets an overall deadline (REQUEST_DEADLINE_SECONDS, or less if
+the caller sends X-Request-Timeout-Ms). Each upstream call gets the smaller
+of its own timeout (UPSTREAM_TIMEOUT_<NAME>) and the time left on that
+deadline, and goes through a per-upstream circuit breaker:
+
+- closed: calls flow; `failure_threshold` consecutive failures open it.
+- open: calls fail fast with UpstreamUnavailable for `recovery_timeout` seconds.
+- half-open: a limited number of probe calls are let through; a success
+  closes the breaker, a failure re-opens it.
+"""
+import contextvars
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, TypeVar
+
+from starlette.datastructures import Headers
+
+T = TypeVar("T")
+
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "150"))
+
+# Default per-upstream timeouts in seconds
+UPSTREAM_TIMEOUTS = {
+    "openrouter": 30.0,
+    "huggingface": 90.0,
+    "freeimage": 30.0,
+    "image_loopback": 120.0,
+    "sui_rpc": 10.0,
+}
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar("request_deadline", default=None)
+
+
+class UpstreamUnavailable(RuntimeError):
+    """The upstream's circuit breaker is open"""
+
+
+class DeadlineExceeded(RuntimeError):
+    """No time left in the request budget for another upstream call"""
+
+
+def upstream_timeout(upstream: str) -> float:
+    default = UPSTREAM_TIMEOUTS.get(upstream, 30.0)
+    return float(os.getenv(f"UPSTREAM_TIMEOUT_{upstream.upper()}", default))
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline, if one is set"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def budget(upstream: str) -> float:
+    """Timeout for the next call to `upstream` within the request deadline"""
+    timeout = upstream_timeout(upstream)
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded(f"Request deadline exceeded before calling {upstream}")
+    return min(timeout, left)
+
+
+def deadline_header() -> Dict[str, str]:
+    """Propagate the remaining budget to a downstream service we call"""
+    left = remaining()
+    if left is None:
+        return {}
+    return {DEADLINE_HEADER: str(max(int(left * 1000), 0))}
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open probing"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.half_open_calls = 0
+        self.total_calls = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    self.total_rejected += 1
+                    retry_in = self.recovery_timeout - (time.monotonic() - self.opened_at)
+                    raise UpstreamUnavailable(
+                        f"{self.name} is temporarily unavailable (circuit open, retry in {retry_in:.0f}s): {self.last_error}"
+                    )
+                self.state = "half_open"
+                self.half_open_calls = 0
+            if self.state == "half_open":
+                if self.half_open_calls >= self.half_open_max_calls:
+                    self.total_rejected += 1
+                    raise UpstreamUnavailable(f"{self.name} is temporarily unavailable (recovery probe in progress)")
+                self.half_open_calls += 1
+            self.total_calls += 1
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self, error: str):
+        with self._lock:
+            self.total_failures += 1
+            self.consecutive_failures += 1
+            self.last_error = error
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"⚡ Circuit for {self.name} opened after {self.consecutive_failures} failures: {error}")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "recovery_timeout": self.recovery_timeout,
+                "timeout": upstream_timeout(self.name),
+                "total_calls": self.total_calls,
+                "total_failures": self.total_failures,
+                "total_rejected": self.total_rejected,
+                "last_error": self.last_error,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(upstream: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if upstream not in _breakers:
+            _breakers[upstream] = CircuitBreaker(
+                upstream,
+                failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+                recovery_timeout=float(os.getenv("CIRCUIT_RECOVERY_SECONDS", "30")),
+            )
+        return _breakers[upstream]
+
+
+def call(upstream: str, fn: Callable[[float], T], is_failure: Callable[[T], bool] = lambda result: False) -> T:
+    """Call `fn(timeout)` through the upstream's breaker with a budgeted timeout"""
+    circuit = breaker(upstream)
+    timeout = budget(upstream)
+    circuit.before_call()
+    try:
+        result = fn(timeout)
+    except Exception as e:
+        circuit.record_failure(f"{type(e).__name__}: {e}")
+        raise
+    if is_failure(result):
+        circuit.record_failure("unhealthy response")
+    else:
+        circuit.record_success()
+    return result
+
+
+def breaker_states() -> Dict[str, Dict]:
+    for upstream in UPSTREAM_TIMEOUTS:
+        breaker(upstream)
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {circuit.name: circuit.snapshot() for circuit in breakers}
+
+
+class DeadlineMiddleware:
+    """ASGI middleware starting the overall deadline for each HTTP request"""
+
+    def __init__(self, app, default_seconds: float = REQUEST_DEADLINE_SECONDS):
+        self.app = app
+        self.default_seconds = default_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        seconds = self.default_seconds
+        requested = Headers(scope=scope).get(DEADLINE_HEADER)
+        if requested:
+            try:
+                seconds = min(seconds, max(int(requested), 0) / 1000)
+            except ValueError:
+                pass
+        token = _deadline.set(time.monotonic() + seconds)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
@@ -0,0 +1,161 @@
+"""
+Static file serving for the bundled frontend with precompression and cache policy.
+
+- Text assets are precompressed to .br/.gz next to the originals (at build time
+  via `python static_files.py <dir>`, or on startup) and the best encoding the
+  client accepts is served with Content-Encoding and Vary headers.
+- Vite's content-hashed files under assets/ are served as immutable;
+  index.html gets a short TTL so new deploys are picked up quickly.
+- ETag / Last-Modified revalidation is answered with 304 before any body is sent.
+"""
+import gzip
+import mimetypes
+import os
+import re
+import sys
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {".js", ".mjs", ".css", ".html", ".svg", ".json", ".map", ".txt", ".xml", ".wasm", ".ico"}
+MIN_COMPRESS_SIZE = 1024
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+HTML_CACHE_CONTROL = f"public, max-age={os.getenv('HTML_CACHE_MAX_AGE', '60')}, must-revalidate"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+
+# Vite emits assets/<name>-<hash>.<ext>, e.g. assets/index-B3xk9_aZ.js
+HASHED_ASSET = re.compile(r"(^|/)assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+
+# (Content-Encoding, file suffix) in order of preference
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def precompress_directory(directory: str) -> Dict[str, int]:
+    """Write .br/.gz siblings for compressible files that are missing or stale"""
+    stats = {"files": 0, "written": 0, "skipped": 0}
+    encodings = [(name, suffix) for name, suffix in ENCODINGS if name != "br" or brotli is not None]
+    for root, _dirs, files in os.walk(directory):
+        for filename in files:
+            path = os.path.join(root, filename)
+            if os.path.splitext(filename)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            source_stat = os.stat(path)
+            if source_stat.st_size < MIN_COMPRESS_SIZE:
+                continue
+            stats["files"] += 1
+            data = None
+            for encoding, suffix in encodings:
+                target = path + suffix
+                if os.path.exists(target) and os.stat(target).st_mtime >= source_stat.st_mtime:
+                    continue
+                if data is None:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                compressed = _compress(data, encoding)
+                if len(compressed) >= len(data):
+                    stats["skipped"] += 1
+                    continue
+                try:
+                    with open(target, "wb") as f:
+                        f.write(compressed)
+                    stats["written"] += 1
+                except OSError as e:
+                    print(f"⚠️ Could not write {target}: {e}")
+                    stats["skipped"] += 1
+    return stats
+
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """Encodings from an Accept-Encoding header with a non-zero q value"""
+    accepted = []
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.append(token)
+    return accepted
+
+
+def cache_control_for(relative_path: str) -> str:
+    if relative_path.endswith(".html"):
+        return HTML_CACHE_CONTROL
+    if HASHED_ASSET.search(relative_path):
+        return IMMUTABLE_CACHE_CONTROL
+    return DEFAULT_CACHE_CONTROL
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with precompressed variants, content negotiation and cache headers"""
+
+    def __init__(self, *, directory: str, html: bool = False, precompress: bool = True):
+        super().__init__(directory=directory, html=html)
+        if precompress:
+            stats = precompress_directory(directory)
+            print(f"🗜️ Precompressed static files: {stats}")
+
+    def _compressed_variant(self, full_path: str, request_headers: Headers) -> Optional[tuple]:
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        if not accepted:
+            return None
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted and "*" not in accepted:
+                continue
+            try:
+                return encoding, full_path + suffix, os.stat(full_path + suffix)
+            except OSError:
+                continue
+        return None
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = os.fspath(full_path)
+        relative_path = os.path.relpath(full_path, os.fspath(self.directory)).replace(os.sep, "/")
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+
+        headers = {"Cache-Control": cache_control_for(relative_path)}
+        variant = None
+        if os.path.splitext(full_path)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+            headers["Vary"] = "Accept-Encoding"
+            variant = self._compressed_variant(full_path, request_headers)
+
+        if variant is not None:
+            encoding, path, variant_stat = variant
+            headers["Content-Encoding"] = encoding
+            response = FileResponse(path, status_code=status_code, headers=headers,
+                                    media_type=media_type, stat_result=variant_stat)
+        else:
+            response = FileResponse(full_path, status_code=status_code, headers=headers,
+                                    media_type=media_type, stat_result=stat_result)
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else os.getenv("STATIC_FILES_PATH", "./static")
+    print(f"🗜️ Precompressing {target}: {precompress_directory(target)}")
@@ -0,0 +1,271 @@
+"""
+Server-side Sui JSON-RPC gateway.
+
+One pooled HTTP client per process, JSON-RPC batching, and TTL caches for
+the wallet reads served to the frontend and the chat path. Reads that miss
+the cache together are sent as one batched request:
+
+- balances (BALANCE_CACHE_SECONDS, default 5s)
+- owned coin objects (COINS_CACHE_SECONDS, default 10s)
+- reference gas price, cached until the current epoch ends
+
+Entries for a wallet are invalidated when a transfer is confirmed. Point
+SUI_RPC_URL at a local stub JSON-RPC server (tests/stub_rpc.py) to test
+without a fullnode.
+
+While a record/replay cassette is active, every batch goes through it as a
+"sui_rpc" interaction and the caches are bypassed, so replays make the same
+calls in the same order without touching the network.
+"""
+import itertools
+import os
+import re
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cassettes
+import resilience
+
+DEFAULT_RPC_URL = "https://fullnode.testnet.sui.io:443"
+SUI_COIN_TYPE = "0x2::sui::SUI"
+MIST_PER_SUI = Decimal(1_000_000_000)
+MAX_COIN_PAGES = 5
+ADDRESS_PATTERN = re.compile(r"0x[0-9a-fA-F]{1,64}")
+
+
+class SuiRpcError(RuntimeError):
+    """The fullnode returned a JSON-RPC error"""
+
+
+def sui_to_mist(amount) -> int:
+    try:
+        return int(Decimal(str(amount)) * MIST_PER_SUI)
+    except InvalidOperation as e:
+        raise ValueError(f"Invalid SUI amount: {amount}") from e
+
+
+def is_sui_address(address) -> bool:
+    return isinstance(address, str) and ADDRESS_PATTERN.fullmatch(address) is not None
+
+
+def mist_to_sui(mist: int) -> str:
+    return str((Decimal(mist) / MIST_PER_SUI).normalize())
+
+
+class TTLCache:
+    """Small thread-safe cache where each entry carries its own expiry.
+
+    Expired entries are swept when the cache is full; if it is still full the
+    oldest entries are evicted, so it never holds more than `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl_seconds: float):
+        with self._lock:
+            now = time.monotonic()
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_entries:
+                for expired in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                    del self._entries[expired]
+                while len(self._entries) >= self.max_entries:
+                    self._entries.popitem(last=False)
+            self._entries[key] = (now + ttl_seconds, value)
+
+    def invalidate(self, predicate):
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class SuiRpcGateway:
+    """Pooled, batching, caching client for the Sui fullnode JSON-RPC API"""
+
+    def __init__(self, rpc_url: str, balance_ttl: float = 5.0, coins_ttl: float = 10.0,
+                 max_connections: int = 20, max_cache_entries: int = 10000):
+        import httpx
+
+        self.rpc_url = rpc_url
+        self.balance_ttl = balance_ttl
+        self.coins_ttl = coins_ttl
+        self.cache = TTLCache(max_cache_entries)
+        self._ids = itertools.count(1)
+        self._client = httpx.Client(
+            timeout=resilience.upstream_timeout("sui_rpc"),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    def batch(self, calls: List[Tuple[str, list]]) -> List[Any]:
+        """Send several JSON-RPC calls in one HTTP request; results in call order"""
+        cassette = cassettes.active()
+        if cassette is not None:
+            request = {"calls": [[method, params] for method, params in calls]}
+            return cassette.call("sui_rpc", request, lambda: self._send(calls))
+        return self._send(calls)
+
+    def _send(self, calls: List[Tuple[str, list]]) -> List[Any]:
+        requests = [
+            {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+            for method, params in calls
+        ]
+        body = requests if len(requests) > 1 else requests[0]
+        response = resilience.call(
+            "sui_rpc",
+            lambda timeout: self._client.post(self.rpc_url, json=body, timeout=timeout),
+            is_failure=lambda response: response.status_code >= 500,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        replies = payload if isinstance(payload, list) else [payload]
+        by_id = {reply.get("id"): reply for reply in replies}
+
+        results = []
+        for request in requests:
+            reply = by_id.get(request["id"])
+            if reply is None:
+                raise SuiRpcError(f"No response for {request['method']}")
+            if "error" in reply:
+                raise SuiRpcError(f"{request['method']} failed: {reply['error']}")
+            results.append(reply.get("result"))
+        return results
+
+    def call(self, method: str, params: list) -> Any:
+        return self.batch([(method, params)])[0]
+
+    def _cached(self, key):
+        # Replays must issue every recorded call, so caching is off under a cassette
+        if cassettes.active() is not None:
+            return None
+        return self.cache.get(key)
+
+    def _store(self, key, value, ttl_seconds: float):
+        if cassettes.active() is None:
+            self.cache.set(key, value, ttl_seconds)
+
+    def _read_through(self, parts: Dict[str, Tuple[Any, str, list, Callable]]) -> Dict[str, Any]:
+        """Cached value for each part; all misses are fetched in one batched request.
+
+        `parts` maps a name to (cache_key, method, params, parse), where
+        parse(result) returns (value, ttl_seconds or None to skip caching).
+        """
+        values = {name: self._cached(key) for name, (key, _, _, _) in parts.items()}
+        missing = [name for name, value in values.items() if value is None]
+        if missing:
+            results = self.batch([(parts[name][1], parts[name][2]) for name in missing])
+            for name, result in zip(missing, results):
+                key, _, _, parse = parts[name]
+                value, ttl = parse(result)
+                values[name] = value
+                if ttl is not None:
+                    self._store(key, value, ttl)
+        return values
+
+    def _balance_part(self, address: str, coin_type: str):
+        return (("balance", address.lower(), coin_type), "suix_getBalance", [address, coin_type],
+                lambda result: (int(result["totalBalance"]), self.balance_ttl))
+
+    def _gas_price_part(self):
+        def parse(state):
+            epoch_end_ms = int(state["epochStartTimestampMs"]) + int(state["epochDurationMs"])
+            ttl = max((epoch_end_ms - time.time() * 1000) / 1000, 1.0)
+            return int(state["referenceGasPrice"]), ttl
+        return (("gas_price",), "suix_getLatestSuiSystemState", [], parse)
+
+    def get_balance(self, address: str, coin_type: str = SUI_COIN_TYPE) -> int:
+        """Total balance in MIST"""
+        return self._read_through({"balance": self._balance_part(address, coin_type)})["balance"]
+
+    def get_reference_gas_price(self) -> int:
+        """Reference gas price in MIST, cached until the current epoch ends"""
+        return self._read_through({"gas_price": self._gas_price_part()})["gas_price"]
+
+    def get_balance_and_gas_price(self, address: str, coin_type: str = SUI_COIN_TYPE) -> Tuple[int, int]:
+        """Balance and reference gas price in MIST, in one round trip when both are cold"""
+        values = self._read_through({
+            "balance": self._balance_part(address, coin_type),
+            "gas_price": self._gas_price_part(),
+        })
+        return values["balance"], values["gas_price"]
+
+    def get_coins(self, address: str, coin_type: str = SUI_COIN_TYPE) -> List[Dict]:
+        """Owned coin objects (first MAX_COIN_PAGES pages)"""
+        key = ("coins", address.lower(), coin_type)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        coins, cursor = [], None
+        for _ in range(MAX_COIN_PAGES):
+            page = self.call("suix_getCoins", [address, coin_type, cursor, 50])
+            coins.extend(page.get("data", []))
+            if not page.get("hasNextPage"):
+                break
+            cursor = page.get("nextCursor")
+        self._store(key, coins, self.coins_ttl)
+        return coins
+
+    def get_wallet_snapshot(self, address: str, coin_type: str = SUI_COIN_TYPE) -> Dict:
+        """Balance, first page of coins and balances of every coin type, in one batched request"""
+        values = self._read_through({
+            "balance": self._balance_part(address, coin_type),
+            "coins": (("coins", address.lower(), coin_type), "suix_getCoins", [address, coin_type, None, 50],
+                      # A partial first page is returned but not cached as the full coin list
+                      lambda result: (result.get("data", []),
+                                      None if result.get("hasNextPage") else self.coins_ttl)),
+            "all_balances": (("all_balances", address.lower()), "suix_getAllBalances", [address],
+                             lambda result: ([{"coin_type": item["coinType"], "balance_mist": int(item["totalBalance"])}
+                                              for item in result], self.balance_ttl)),
+        })
+        # MIST amounts are strings so JavaScript clients do not lose precision
+        return {
+            "address": address,
+            "coin_type": coin_type,
+            "balance_mist": str(values["balance"]),
+            "balance": mist_to_sui(values["balance"]),
+            "coins": values["coins"],
+            "balances": [
+                {"coin_type": item["coin_type"], "balance_mist": str(item["balance_mist"]),
+                 "balance": mist_to_sui(item["balance_mist"])}
+                for item in values["all_balances"]
+            ],
+        }
+
+    def invalidate(self, address: str):
+        """Drop cached balance and coins for a wallet (after a confirmed transfer)"""
+        address = address.lower()
+        self.cache.invalidate(lambda key: len(key) > 1 and key[1] == address)
+
+    def stats(self) -> Dict:
+        return {"rpc_url": self.rpc_url, "cache": self.cache.stats()}
+
+
+@lru_cache(maxsize=1)
+def get_gateway() -> SuiRpcGateway:
+    return SuiRpcGateway(
+        os.getenv("SUI_RPC_URL", DEFAULT_RPC_URL),
+        balance_ttl=float(os.getenv("BALANCE_CACHE_SECONDS", "5")),
+        coins_ttl=float(os.getenv("COINS_CACHE_SECONDS", "10")),
+        max_cache_entries=int(os.getenv("SUI_RPC_CACHE_MAX_ENTRIES", "10000")),
+    )
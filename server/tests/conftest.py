@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Server modules are imported top-level (as main.py does)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
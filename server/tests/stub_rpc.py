@@ -0,0 +1,112 @@
+"""
+Minimal Sui JSON-RPC stub for exercising the gateway without a fullnode.
+
+Serves suix_getBalance, suix_getAllBalances, suix_getCoins and
+suix_getLatestSuiSystemState from in-memory state, accepts single and
+batched requests, and logs the methods of every HTTP request it receives.
+
+    python tests/stub_rpc.py --port 18545 --balance 1.5
+    SUI_RPC_URL=http://127.0.0.1:18545 python main.py
+"""
+import argparse
+import json
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+SUI_COIN_TYPE = "0x2::sui::SUI"
+
+
+class StubState:
+    """Balances, gas price and epoch served by the stub, plus a request log"""
+
+    def __init__(self, default_balance_mist: int = 1_500_000_000, gas_price: int = 1000,
+                 epoch_duration_ms: int = 86_400_000):
+        self.default_balance_mist = default_balance_mist
+        self.balances: Dict[str, int] = {}
+        self.gas_price = gas_price
+        self.epoch_start_ms = int(time.time() * 1000)
+        self.epoch_duration_ms = epoch_duration_ms
+        self.requests: List[List[str]] = []  # methods sent in each HTTP request
+        self._lock = threading.Lock()
+
+    def balance(self, address: str) -> int:
+        return self.balances.get(address.lower(), self.default_balance_mist)
+
+    def methods(self) -> List[str]:
+        with self._lock:
+            return [method for request in self.requests for method in request]
+
+    def result(self, method: str, params: list):
+        if method == "suix_getBalance":
+            return {"coinType": params[1], "coinObjectCount": 1, "totalBalance": str(self.balance(params[0]))}
+        if method == "suix_getAllBalances":
+            return [{"coinType": SUI_COIN_TYPE, "coinObjectCount": 1, "totalBalance": str(self.balance(params[0]))}]
+        if method == "suix_getCoins":
+            coin = {"coinType": params[1], "coinObjectId": "0x" + "1" * 64, "balance": str(self.balance(params[0]))}
+            return {"data": [coin], "nextCursor": None, "hasNextPage": False}
+        if method == "suix_getLatestSuiSystemState":
+            return {
+                "referenceGasPrice": str(self.gas_price),
+                "epochStartTimestampMs": str(self.epoch_start_ms),
+                "epochDurationMs": str(self.epoch_duration_ms),
+            }
+        raise KeyError(method)
+
+    def handle(self, body):
+        requests = body if isinstance(body, list) else [body]
+        with self._lock:
+            self.requests.append([request["method"] for request in requests])
+        replies = []
+        for request in requests:
+            try:
+                replies.append({"jsonrpc": "2.0", "id": request["id"],
+                                "result": self.result(request["method"], request.get("params", []))})
+            except KeyError:
+                replies.append({"jsonrpc": "2.0", "id": request["id"],
+                                "error": {"code": -32601, "message": f"Method not found: {request['method']}"}})
+        return replies if isinstance(body, list) else replies[0]
+
+
+def serve(state: StubState, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the stub in a daemon thread; the bound port is server.server_address[1]"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            data = json.dumps(state.handle(body)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="stub-rpc", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Sui JSON-RPC stub")
+    parser.add_argument("--port", type=int, default=18545)
+    parser.add_argument("--balance", default="1.5", help="SUI balance reported for every address")
+    parser.add_argument("--gas-price", type=int, default=1000)
+    args = parser.parse_args()
+
+    state = StubState(int(Decimal(args.balance) * 1_000_000_000), args.gas_price)
+    server = serve(state, port=args.port)
+    print(f"🧪 Stub Sui RPC listening on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
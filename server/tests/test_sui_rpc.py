@@ -0,0 +1,132 @@
+import time
+
+import pytest
+
+import cassettes
+from stub_rpc import StubState, serve
+from sui_rpc import SuiRpcError, SuiRpcGateway, TTLCache
+
+ALICE = "0x" + "a" * 64
+BOB = "0x" + "b" * 64
+
+
+@pytest.fixture
+def stub():
+    state = StubState()
+    server = serve(state)
+    state.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+
+
+@pytest.fixture
+def gateway(stub):
+    return SuiRpcGateway(stub.url, balance_ttl=0.3, coins_ttl=0.3)
+
+
+def test_cold_wallet_snapshot_is_one_batched_request(stub, gateway):
+    snapshot = gateway.get_wallet_snapshot(ALICE)
+
+    assert snapshot["balance"] == "1.5"
+    assert snapshot["balances"][0]["coin_type"] == "0x2::sui::SUI"
+    assert len(snapshot["coins"]) == 1
+    assert stub.requests == [["suix_getBalance", "suix_getCoins", "suix_getAllBalances"]]
+
+    gateway.get_wallet_snapshot(ALICE)
+    assert len(stub.requests) == 1
+
+
+def test_balance_expires_after_ttl(stub, gateway):
+    assert gateway.get_balance(ALICE) == 1_500_000_000
+    stub.balances[ALICE] = 2_000_000_000
+    assert gateway.get_balance(ALICE) == 1_500_000_000
+
+    time.sleep(0.35)
+    assert gateway.get_balance(ALICE) == 2_000_000_000
+    assert stub.methods() == ["suix_getBalance", "suix_getBalance"]
+
+
+def test_gas_price_cached_until_epoch_end(stub, gateway):
+    # Epoch ends about 1.2s from now
+    stub.epoch_start_ms = int(time.time() * 1000) - stub.epoch_duration_ms + 1200
+    assert gateway.get_reference_gas_price() == 1000
+    stub.gas_price = 750
+    assert gateway.get_reference_gas_price() == 1000
+
+    time.sleep(1.3)
+    assert gateway.get_reference_gas_price() == 750
+    assert len(stub.requests) == 2
+
+
+def test_balance_and_gas_price_share_one_round_trip(stub, gateway):
+    assert gateway.get_balance_and_gas_price(ALICE) == (1_500_000_000, 1000)
+    assert stub.requests == [["suix_getBalance", "suix_getLatestSuiSystemState"]]
+
+    # Only the expired balance is fetched again
+    time.sleep(0.35)
+    gateway.get_balance_and_gas_price(ALICE)
+    assert stub.requests[-1] == ["suix_getBalance"]
+
+
+def test_invalidate_drops_only_that_wallet(stub, gateway):
+    gateway.get_wallet_snapshot(ALICE)
+    gateway.get_wallet_snapshot(BOB)
+    gateway.get_reference_gas_price()
+    stub.requests.clear()
+
+    gateway.invalidate(ALICE.upper().replace("0X", "0x"))
+    gateway.get_wallet_snapshot(ALICE)
+    gateway.get_wallet_snapshot(BOB)
+    gateway.get_reference_gas_price()
+
+    assert stub.requests == [["suix_getBalance", "suix_getCoins", "suix_getAllBalances"]]
+
+
+def test_batch_returns_results_in_call_order_and_raises_on_errors(stub, gateway):
+    gas_state, balance = gateway.batch([
+        ("suix_getLatestSuiSystemState", []),
+        ("suix_getBalance", [ALICE, "0x2::sui::SUI"]),
+    ])
+    assert gas_state["referenceGasPrice"] == "1000"
+    assert balance["totalBalance"] == "1500000000"
+
+    with pytest.raises(SuiRpcError):
+        gateway.batch([("suix_getBalance", [ALICE, "0x2::sui::SUI"]), ("sui_unknownMethod", [])])
+
+
+def test_cassette_records_rpc_calls_and_replays_them_offline(stub, gateway, tmp_path):
+    path = tmp_path / "rpc.json"
+    with cassettes.use_cassette(path, "record") as cassette:
+        assert gateway.get_balance(ALICE) == 1_500_000_000
+        assert gateway.get_balance(ALICE) == 1_500_000_000  # not served from the cache
+        assert [item["kind"] for item in cassette.interactions] == ["sui_rpc", "sui_rpc"]
+    assert len(stub.requests) == 2
+
+    offline = SuiRpcGateway("http://127.0.0.1:9")
+    with cassettes.use_cassette(path, "replay") as cassette:
+        assert offline.get_balance(ALICE) == 1_500_000_000
+        assert offline.get_balance(ALICE) == 1_500_000_000
+        assert cassette.mismatches == []
+    assert offline.cache.stats()["entries"] == 0
+
+
+def test_ttl_cache_is_bounded():
+    cache = TTLCache(max_entries=3)
+    cache.set("expired", 1, 0)
+    for key in range(5):
+        cache.set(key, key, 60)
+
+    assert cache.stats()["entries"] == 3
+    assert cache.get("expired") is None
+    assert [cache.get(key) for key in range(5)] == [None, None, 2, 3, 4]
+
+
+def test_transfer_balance_check_uses_one_round_trip(stub, gateway, monkeypatch):
+    from graphs import transfer
+
+    monkeypatch.setattr(transfer, "get_gateway", lambda: gateway)
+
+    error = transfer.check_balance(ALICE, ["2"])
+    assert error["error"] == "insufficient_balance"
+    assert stub.requests == [["suix_getBalance", "suix_getLatestSuiSystemState"]]
+    assert transfer.check_balance(ALICE, [1]) is None
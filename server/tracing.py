@@ -0,0 +1,287 @@
+"""
+Lightweight span-based request tracing.
+
+Spans are collected per request (or per `collect()` block) through context
+variables, so they follow the request into the threadpool that runs sync
+handlers and into LangGraph nodes. Finished traces can be exported as
+OTLP/JSON to a local collector (OTEL_EXPORTER_OTLP_ENDPOINT) and/or appended
+to a file (TRACE_EXPORT_FILE, one OTLP/JSON export request per line).
+"""
+import contextvars
+import functools
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "sui-chat-wallet-backend")
+
+
+class Span:
+    """A single timed operation inside a trace"""
+
+    __slots__ = ("name", "span_id", "parent_id", "attributes", "start_ns", "end_ns",
+                 "cpu_start", "cpu_ms", "alloc_start", "alloc_bytes", "status", "error")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict):
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.cpu_start = time.thread_time()
+        self.cpu_ms = None
+        self.alloc_start = _traced_memory()
+        self.alloc_bytes = None
+        self.status = "ok"
+        self.error = None
+
+    def finish(self):
+        self.end_ns = time.time_ns()
+        self.cpu_ms = round((time.thread_time() - self.cpu_start) * 1000, 3)
+        if self.alloc_start is not None:
+            current = _traced_memory()
+            self.alloc_bytes = current - self.alloc_start if current is not None else None
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return round((end_ns - self.start_ns) / 1e6, 3)
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "duration_ms": self.duration_ms,
+            "cpu_ms": self.cpu_ms,
+            "alloc_bytes": self.alloc_bytes,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """All spans recorded for one request"""
+
+    def __init__(self, name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None):
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.remote_parent_id = parent_id
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self.root = self.start_span(name, parent_id, {})
+
+    def start_span(self, name: str, parent_id: Optional[str], attributes: Dict) -> Span:
+        span = Span(name, parent_id, attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def finish_root(self):
+        """Close the root span, taking CPU time from its direct children.
+
+        The root span opens and closes on the event loop thread, which is
+        shared by every concurrent request, so its own thread_time delta
+        would count other requests' CPU as well.
+        """
+        self.root.finish()
+        with self._lock:
+            children = [s for s in self.spans if s.parent_id == self.root.span_id and s.cpu_ms is not None]
+        self.root.cpu_ms = round(sum(s.cpu_ms for s in children), 3)
+
+    def finished_spans(self) -> List[Span]:
+        with self._lock:
+            return [span for span in self.spans if span.end_ns is not None]
+
+    def server_timing(self) -> str:
+        """Render spans as a Server-Timing header value"""
+        entries = []
+        for index, span in enumerate(self.finished_spans()):
+            token = "".join(c if c.isalnum() or c in "._-" else "_" for c in span.name)
+            entries.append(f'{index}-{token};dur={span.duration_ms}')
+        return ", ".join(entries)
+
+
+def _traced_memory() -> Optional[int]:
+    import tracemalloc
+    if not tracemalloc.is_tracing():
+        return None
+    return tracemalloc.get_traced_memory()[0]
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a block as a child of the current span; no-op outside a trace"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    current = trace.start_span(name, _current_span.get(), attributes)
+    token = _current_span.set(current.span_id)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.error = str(e)
+        raise
+    finally:
+        current.finish()
+        _current_span.reset(token)
+
+
+def traced(name: str):
+    """Decorator form of `span` for graph nodes, routers and helpers"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def parse_traceparent(header: Optional[str]):
+    """Parse a W3C traceparent header into (trace_id, parent_span_id)"""
+    if not header:
+        return None, None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None, None
+    return parts[1], parts[2]
+
+
+def traceparent() -> Optional[str]:
+    """W3C traceparent header for propagating the current span to an upstream call"""
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+    return f"00-{trace.trace_id}-{_current_span.get() or trace.root.span_id}-01"
+
+
+def start_trace(name: str, traceparent_header: Optional[str] = None):
+    """Begin a trace in the current context; returns a token for `end_trace`"""
+    trace_id, parent_id = parse_traceparent(traceparent_header)
+    trace = Trace(name, trace_id, parent_id)
+    return trace, (_current_trace.set(trace), _current_span.set(trace.root.span_id))
+
+
+def end_trace(trace: Trace, tokens, **attributes):
+    """Finish the root span, restore the context and hand the trace to the exporter"""
+    trace.root.attributes.update(attributes)
+    trace.finish_root()
+    trace_token, span_token = tokens
+    _current_span.reset(span_token)
+    _current_trace.reset(trace_token)
+    exporter.submit(trace)
+
+
+@contextmanager
+def collect(name: str):
+    """Trace a block outside of an HTTP request (scripts, replay harness)"""
+    trace, tokens = start_trace(name)
+    try:
+        yield trace
+    finally:
+        end_trace(trace, tokens)
+
+
+def to_otlp(trace: Trace) -> Dict:
+    """Convert a trace to an OTLP/JSON ExportTraceServiceRequest"""
+    def attribute(key, value):
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        return {"key": key, "value": typed}
+
+    spans = []
+    for item in trace.finished_spans():
+        attributes = dict(item.attributes)
+        attributes["cpu_ms"] = item.cpu_ms
+        if item.alloc_bytes is not None:
+            attributes["alloc_bytes"] = item.alloc_bytes
+        otlp_span = {
+            "traceId": trace.trace_id,
+            "spanId": item.span_id,
+            "name": item.name,
+            "kind": 2 if item is trace.root else 1,
+            "startTimeUnixNano": str(item.start_ns),
+            "endTimeUnixNano": str(item.end_ns),
+            "attributes": [attribute(k, v) for k, v in attributes.items() if v is not None],
+            "status": {"code": 2, "message": item.error} if item.status == "error" else {"code": 1},
+        }
+        if item.parent_id:
+            otlp_span["parentSpanId"] = item.parent_id
+        spans.append(otlp_span)
+
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": "sui-chat-wallet.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+class TraceExporter:
+    """Ships finished traces off the request path in a background thread"""
+
+    def __init__(self):
+        self.endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "").rstrip("/")
+        self.file_path = os.getenv("TRACE_EXPORT_FILE", "")
+        self._queue: "queue.Queue[Trace]" = queue.Queue(maxsize=1000)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.endpoint or self.file_path)
+
+    def submit(self, trace: Trace):
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            print("⚠️ Trace export queue full, dropping trace")
+
+    def _run(self):
+        while True:
+            trace = self._queue.get()
+            try:
+                self.export(trace)
+            except Exception as e:
+                print(f"⚠️ Trace export failed: {e}")
+
+    def export(self, trace: Trace):
+        payload = to_otlp(trace)
+        if self.file_path:
+            with open(self.file_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(payload) + "\n")
+        if self.endpoint:
+            import httpx
+            httpx.post(f"{self.endpoint}/v1/traces", json=payload, timeout=5.0)
+
+
+exporter = TraceExporter()
@@ -7,6 +7,8 @@ export const API_CONFIG = {
     MODELS: "/api/models",
     CHAT: "/api/chat",
     TRANSFER_EXECUTE: "/api/transfer/execute",
+    TRANSFER_CONFIRMED: "/api/transfer/confirmed",
+    SUI_WALLET: "/api/sui/wallets",
     NFT_MINT: "/api/mint-nft",
     UPLOAD_IMAGE: "/api/upload/image",
   },
@@ -80,8 +80,8 @@ export interface ImageGenerationRequest {
 export interface ImageGenerationResponse {
   success: boolean;
   message?: string;
-  image_url?: string;
   image_base64?: string;
+  mime_type?: string;
   prompt?: string;
   prompt_used?: string;
   error?: string;
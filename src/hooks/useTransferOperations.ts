@@ -1,12 +1,18 @@
 import { useState, useCallback } from "react";
-import { useSignAndExecuteTransaction, useSuiClient } from "@mysten/dapp-kit";
+import {
+  useCurrentAccount,
+  useSignAndExecuteTransaction,
+  useSuiClient,
+} from "@mysten/dapp-kit";
 import { Transaction } from "@mysten/sui/transactions";
 import { MIST_PER_SUI } from "@mysten/sui/utils";
+import { API_CONFIG, getApiUrl } from "../config/api";
 
 // Local Message type removed (unused)
 
 export function useTransferOperations() {
   const suiClient = useSuiClient();
+  const currentAccount = useCurrentAccount();
   const { mutateAsync: signAndExecuteTransactionBlock } =
     useSignAndExecuteTransaction();
 
@@ -193,6 +199,25 @@ export function useTransferOperations() {
     [signAndExecuteTransactionBlock]
   );
 
+  // Let the backend drop its cached balances for the wallets involved
+  const notifyTransferConfirmed = useCallback(
+    (digest: string, recipients: string[]) => {
+      if (!currentAccount) return;
+      fetch(getApiUrl(API_CONFIG.ENDPOINTS.TRANSFER_CONFIRMED), {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+          wallet_address: currentAccount.address,
+          digest,
+          recipients,
+        }),
+      }).catch((error) =>
+        console.error("Transfer confirmation notify error:", error)
+      );
+    },
+    [currentAccount]
+  );
+
   const handleConfirmTransfer = useCallback(async () => {
     if (!pendingTransfer) return undefined as any;
 
@@ -204,10 +229,19 @@ export function useTransferOperations() {
         const results = await executeSerialTransactions(
           pendingTransfer.recipients
         );
+        notifyTransferConfirmed(
+          results.map((r: any) => r.digest).join(","),
+          pendingTransfer.recipients.map((r: any) => r.to_address)
+        );
         return results;
       } else {
         // Single transaction for single recipient
         const result = await executeSingleTransaction(pendingTransfer);
+        const recipients =
+          pendingTransfer.recipients?.length === 1
+            ? [pendingTransfer.recipients[0].to_address]
+            : [pendingTransfer.to_address];
+        notifyTransferConfirmed(result.digest, recipients.filter(Boolean));
         return result;
       }
     } catch (error) {
@@ -217,7 +251,12 @@ export function useTransferOperations() {
       setPendingTransfer(null);
       setIsExecutingTransaction(false);
     }
-  }, [pendingTransfer, executeSerialTransactions, executeSingleTransaction]);
+  }, [
+    pendingTransfer,
+    executeSerialTransactions,
+    executeSingleTransaction,
+    notifyTransferConfirmed,
+  ]);
 
   const handleCancelTransfer = useCallback(() => {
     setPendingTransfer(null);
@@ -1,5 +1,16 @@
 import { SuiClient, getFullnodeUrl } from "@mysten/sui/client";
 import { Transaction } from "@mysten/sui/transactions";
+import { API_CONFIG, getApiUrl } from "../config/api";
+
+// Network served by the backend's cached Sui RPC gateway
+const GATEWAY_NETWORK = import.meta.env.VITE_SUI_NETWORK || "testnet";
+
+interface GatewayWallet {
+  address: string;
+  balance: string;
+  balance_mist: string;
+  balances: { coin_type: string; balance_mist: string; balance: string }[];
+}
 
 export interface WalletBalance {
   coinType: string;
@@ -65,6 +76,7 @@ export interface NetworkInfo {
 class SuiService {
   private client: SuiClient;
   private network: "mainnet" | "testnet" | "devnet" | "localnet";
+  private pendingGatewayReads = new Map<string, Promise<GatewayWallet>>();
 
   constructor(
     network: "mainnet" | "testnet" | "devnet" | "localnet" = "testnet"
@@ -211,7 +223,44 @@ class SuiService {
     }
   }
 
+  // Balance reads go through the backend gateway (cached, one batched RPC
+  // per wallet); concurrent reads for the same wallet share one request
+  private getGatewayWallet(address: string): Promise<GatewayWallet> {
+    const pending = this.pendingGatewayReads.get(address);
+    if (pending) return pending;
+
+    const request = fetch(
+      getApiUrl(`${API_CONFIG.ENDPOINTS.SUI_WALLET}/${address}`)
+    )
+      .then(async (response) => {
+        if (!response.ok) {
+          throw new Error(`HTTP ${response.status}`);
+        }
+        const data = await response.json();
+        if (!data.success) {
+          throw new Error(data.error || "Failed to load wallet");
+        }
+        return data.data as GatewayWallet;
+      })
+      .finally(() => this.pendingGatewayReads.delete(address));
+    this.pendingGatewayReads.set(address, request);
+    return request;
+  }
+
+  private useGateway(): boolean {
+    return this.network === GATEWAY_NETWORK;
+  }
+
   public async getSuiBalance(address: string): Promise<string> {
+    if (this.useGateway()) {
+      try {
+        const wallet = await this.getGatewayWallet(address);
+        return wallet.balance;
+      } catch (error) {
+        console.error("Gateway balance read failed, using fullnode:", error);
+      }
+    }
+
     try {
       const balance = await this.client.getBalance({ owner: address });
       return this.formatBalance(balance.totalBalance, 9); // SUI has 9 decimals
@@ -222,6 +271,21 @@ class SuiService {
   }
 
   public async getAllTokens(address: string): Promise<TokenInfo[]> {
+    if (this.useGateway()) {
+      try {
+        const wallet = await this.getGatewayWallet(address);
+        return Promise.all(
+          wallet.balances.map(async (item) => ({
+            coinType: item.coin_type,
+            balance: item.balance_mist,
+            metadata: await this.getCoinMetadata(item.coin_type),
+          }))
+        );
+      } catch (error) {
+        console.error("Gateway token read failed, using fullnode:", error);
+      }
+    }
+
     try {
       const coins = await this.client.getAllCoins({ owner: address });
       const balanceMap = new Map<string, string>();